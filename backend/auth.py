@@ -5,12 +5,78 @@ from repositories.user_repository import UserRepository
 from helpers import Helpers
 from database import get_db
 from exceptions import JWTError, TokenExpiredError, UnauthorizedError
+from redis_client import redis_client
+from functools import lru_cache
+import asyncio
 import jwt
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
 security = HTTPBearer()
+security_optional = HTTPBearer(auto_error=False)
+
+# Verified-token cache: token -> {"user": dict, "expires": epoch seconds}.
+# Entries live for at most _TOKEN_CACHE_TTL seconds (never past the JWT exp)
+# so revoked/deactivated users are picked up quickly on the next miss.
+_token_cache: dict = {}
+_TOKEN_CACHE_TTL = 60
+_TOKEN_CACHE_MAX_SIZE = 10000
+
+# Cross-worker eviction channel: the token cache is per-process and uvicorn
+# serves with multiple workers by default, so a revocation handled by one
+# worker has to be fanned out to the others.
+_INVALIDATION_CHANNEL = "auth:token_invalidate"
+
+def _evict_local(user_id: str) -> None:
+    """Drop this process's cached verifications for a user
+
+    The scan is bounded by _TOKEN_CACHE_MAX_SIZE and runs only for rare,
+    user-initiated revocation events.
+    """
+    stale = [
+        token for token, entry in _token_cache.items()
+        if entry["user"]["user_id"] == user_id
+    ]
+    for token in stale:
+        _token_cache.pop(token, None)
+
+async def invalidate_user_tokens(user_id: str) -> None:
+    """Evict a user's cached token verifications on every worker
+
+    Logout, password change, and deactivation call this so revocation is
+    immediate instead of waiting out the cache TTL. Local eviction covers
+    the worker that served the request; the publish reaches the rest via
+    token_invalidation_listener. If Redis is down, other workers fall back
+    to the TTL bound (<= 60s of staleness).
+    """
+    _evict_local(user_id)
+    await redis_client.publish(_INVALIDATION_CHANNEL, user_id)
+
+async def token_invalidation_listener() -> None:
+    """Apply eviction messages published by other workers
+
+    Started as a background task from the app lifespan; one subscriber
+    connection per worker, no per-request cost on the auth path.
+    """
+    pubsub = redis_client.pubsub()
+    if pubsub is None:
+        logger.warning("Redis unavailable, token eviction is TTL-only")
+        return
+    try:
+        await pubsub.subscribe(_INVALIDATION_CHANNEL)
+        async for message in pubsub.listen():
+            if message.get("type") != "message":
+                continue
+            data = message["data"]
+            _evict_local(data.decode() if isinstance(data, bytes) else data)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning(f"Token invalidation listener stopped: {e}")
+    finally:
+        await pubsub.aclose()
 
 class AuthToken:
     """Authentication token model"""
@@ -25,7 +91,14 @@ async def get_current_user(
     """Get current authenticated user"""
     try:
         token = credentials.credentials
-        
+
+        # Serve recently verified tokens from cache (skips HMAC + DB lookup)
+        cached = _token_cache.get(token)
+        if cached:
+            if cached["expires"] > time.time():
+                return cached["user"]
+            del _token_cache[token]
+
         # Verify token
         try:
             decoded = Helpers.verify_access_token(token)
@@ -44,13 +117,23 @@ async def get_current_user(
         user = await UserRepository.find_by_id(session, user_id)
         if not user or not user.is_active:
             raise UnauthorizedError("User not found or inactive")
-        
-        return {
+
+        user_dict = {
             "user_id": user.id,
             "email": user.email,
             "role": user.role,
             "is_active": user.is_active
         }
+
+        # Cache verified token, bounded by both TTL and token expiry
+        if len(_token_cache) >= _TOKEN_CACHE_MAX_SIZE:
+            _token_cache.clear()
+        _token_cache[token] = {
+            "user": user_dict,
+            "expires": min(time.time() + _TOKEN_CACHE_TTL, decoded.get("exp", 0))
+        }
+
+        return user_dict
     except (JWTError, TokenExpiredError, UnauthorizedError):
         raise
     except Exception as e:
@@ -58,13 +141,13 @@ async def get_current_user(
         raise UnauthorizedError("Authentication failed")
 
 async def get_optional_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security) if False else None,
-    session: AsyncSession = Depends(get_db) if False else None
+    credentials: HTTPAuthorizationCredentials | None = Depends(security_optional),
+    session: AsyncSession = Depends(get_db)
 ) -> dict | None:
     """Get optional authenticated user (for public endpoints)"""
     if not credentials:
         return None
-    
+
     try:
         user = await get_current_user(credentials, session)
         return user
@@ -82,8 +165,13 @@ async def get_current_admin(
         )
     return current_user
 
-async def require_role(allowed_roles: list[str]):
-    """Require user to have one of the allowed roles"""
+@lru_cache(maxsize=32)
+def require_role(allowed_roles: frozenset):
+    """Require user to have one of the allowed roles
+
+    Memoized so each role combination shares one dependency callable
+    across endpoints; pass a frozenset, e.g. require_role(frozenset({"admin"})).
+    """
     async def role_checker(current_user: dict = Depends(get_current_user)) -> dict:
         if current_user["role"] not in allowed_roles:
             raise HTTPException(
@@ -91,5 +179,5 @@ async def require_role(allowed_roles: list[str]):
                 detail="Insufficient permissions"
             )
         return current_user
-    
+
     return role_checker
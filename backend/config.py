@@ -1,68 +1,87 @@
 from pydantic_settings import BaseSettings
-from pydantic import field_validator
+from pydantic import field_validator, model_validator
 from typing import Optional, List
-import os
 from functools import lru_cache
 
 class Settings(BaseSettings):
     # API Configuration
-    port: int = int(os.getenv("PORT", 8000))
-    environment: str = os.getenv("ENVIRONMENT", "development")
-    api_version: str = os.getenv("API_VERSION", "v1")
+    port: int = 8000
+    environment: str = "development"
+    api_version: str = "v1"
     api_title: str = "RideShare API"
     api_description: str = "Rideshare backend service with location tracking"
-    
+    uvicorn_workers: Optional[int] = None  # defaults to cpu count in production
+
     # Database Configuration
-    db_host: str = os.getenv("DB_HOST", "localhost")
-    db_port: int = int(os.getenv("DB_PORT", 5432))
-    db_name: str = os.getenv("DB_NAME", "rideshare_db")
-    db_user: str = os.getenv("DB_USER", "postgres")
-    db_password: str = os.getenv("DB_PASSWORD", "")
-    database_url: str = os.getenv(
-        "DATABASE_URL",
-        f"postgresql://{os.getenv('DB_USER', 'postgres')}:{os.getenv('DB_PASSWORD', '')}@"
-        f"{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', 5432)}/{os.getenv('DB_NAME', 'rideshare_db')}"
-    )
-    
+    db_host: str = "localhost"
+    db_port: int = 5432
+    db_name: str = "rideshare_db"
+    db_user: str = "postgres"
+    db_password: str = ""
+    database_url: str = ""
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+
     # JWT Configuration
-    jwt_secret: str = os.getenv("JWT_SECRET", "your-secret-key-change-in-production")
-    jwt_refresh_secret: str = os.getenv("JWT_REFRESH_SECRET", "your-refresh-secret-key")
-    jwt_expire_minutes: int = int(os.getenv("JWT_EXPIRE_MINUTES", 15))
-    jwt_refresh_expire_days: int = int(os.getenv("JWT_REFRESH_EXPIRE_DAYS", 7))
-    
+    jwt_secret: str = "your-secret-key-change-in-production"
+    jwt_refresh_secret: str = "your-refresh-secret-key"
+    jwt_expire_minutes: int = 15
+    jwt_refresh_expire_days: int = 7
+
     # Redis Configuration
-    redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-    redis_password: Optional[str] = os.getenv("REDIS_PASSWORD")
-    
+    redis_url: str = "redis://localhost:6379/0"
+    redis_password: Optional[str] = None
+    redis_pool_size: int = 50
+
     # Upload Configuration
-    upload_path: str = os.getenv("UPLOAD_PATH", "uploads/")
-    max_file_size: int = int(os.getenv("MAX_FILE_SIZE", 5242880))  # 5MB
+    upload_path: str = "uploads/"
+    max_file_size: int = 5242880  # 5MB
     allowed_file_types: List[str] = ["jpg", "jpeg", "png", "gif"]
-    
+
     # Rate Limiting Configuration
-    rate_limit_window_minutes: int = int(os.getenv("RATE_LIMIT_WINDOW_MINUTES", 15))
-    rate_limit_max_requests: int = int(os.getenv("RATE_LIMIT_MAX_REQUESTS", 100))
+    rate_limit_window_minutes: int = 15
+    rate_limit_max_requests: int = 100
     auth_rate_limit_max_requests: int = 5
     location_rate_limit_max_requests: int = 30
-    
+
     # Location Configuration
-    drift_alert_distance_km: float = float(os.getenv("DRIFT_ALERT_DISTANCE_KM", 2.0))
-    location_update_interval_ms: int = int(os.getenv("LOCATION_UPDATE_INTERVAL_MS", 30000))
-    
+    drift_alert_distance_km: float = 2.0
+    location_update_interval_ms: int = 30000
+
+    # CORS / Host Configuration
+    allowed_origins: List[str] = ["http://localhost:3000"]
+    allowed_hosts: List[str] = ["localhost", "127.0.0.1"]
+
     # WebSocket Configuration
-    websocket_cors_origin: str = os.getenv("WEBSOCKET_CORS_ORIGIN", "http://localhost:3000")
-    
+    websocket_cors_origin: str = "http://localhost:3000"
+
     # Logging Configuration
-    log_level: str = os.getenv("LOG_LEVEL", "INFO").upper()
-    log_file: str = os.getenv("LOG_FILE", "logs/app.log")
-    
-    @field_validator("allowed_file_types", mode="before")
+    log_level: str = "INFO"
+    log_file: str = "logs/app.log"
+
+    @field_validator("allowed_file_types", "allowed_origins", "allowed_hosts", mode="before")
     @classmethod
-    def parse_allowed_file_types(cls, v):
+    def parse_comma_separated_list(cls, v):
         if isinstance(v, str):
             return [x.strip() for x in v.split(",")]
         return v
-    
+
+    @field_validator("log_level")
+    @classmethod
+    def uppercase_log_level(cls, v: str) -> str:
+        return v.upper()
+
+    @model_validator(mode="after")
+    def assemble_database_url(self):
+        if not self.database_url:
+            self.database_url = (
+                f"postgresql://{self.db_user}:{self.db_password}@"
+                f"{self.db_host}:{self.db_port}/{self.db_name}"
+            )
+        return self
+
     class Config:
         env_file = ".env"
         case_sensitive = False
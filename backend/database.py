@@ -10,13 +10,20 @@ class Base(DeclarativeBase):
     """Base class for all models"""
     pass
 
+# Resolve connection URLs once; settings attribute reads go through
+# pydantic's descriptor machinery and don't belong on hot paths.
+_ASYNC_DATABASE_URL = settings.database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+
 # For async operations
 async_engine = create_async_engine(
-    settings.database_url.replace("postgresql://", "postgresql+asyncpg://"),
+    _ASYNC_DATABASE_URL,
     echo=settings.environment == "development",
     future=True,
-    pool_size=20,
-    max_overflow=40,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=True,
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -42,6 +49,9 @@ sync_engine = create_engine(
     settings.database_url,
     echo=settings.environment == "development",
     poolclass=pool.QueuePool,
-    pool_size=20,
-    max_overflow=40,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=True,
 )
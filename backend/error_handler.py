@@ -12,64 +12,65 @@ from response_handler import ApiResponse
 
 logger = logging.getLogger(__name__)
 
+# SQLSTATE code -> (message, status_code); same codes DatabaseError handles
+_SQLSTATE_MAP = {
+    "23505": ("Duplicate entry - resource already exists", 409),  # unique_violation
+    "23503": ("Foreign key constraint violation", 400),  # foreign_key_violation
+    "23502": ("Required field is missing", 400),  # not_null_violation
+}
+
 async def exception_handler(request: Request, exc: Exception) -> JSONResponse:
     """Global exception handler"""
-    
-    # Log error
-    logger.error(
-        f"Error: {type(exc).__name__}",
-        exc_info=True,
-        extra={
-            "path": request.url.path,
-            "method": request.method,
-            "client": request.client,
-        }
-    )
-    
-    # Handle custom rideshare exceptions
+    path = request.url.path
+    method = request.method
+
+    # Handle custom rideshare exceptions (expected flow — skip traceback capture)
     if isinstance(exc, RideShareException):
+        logger.info(
+            "Handled %s: %s [%s %s]",
+            type(exc).__name__, exc.message, method, path
+        )
         return ApiResponse.error(
             message=exc.message,
             status_code=exc.status_code,
             errors=exc.errors
         )
-    
+
     # Handle JWT errors
     if isinstance(exc, jwt.ExpiredSignatureError):
+        logger.info("Expired token [%s %s]", method, path)
         return ApiResponse.unauthorized("Token expired")
-    
+
     if isinstance(exc, jwt.InvalidTokenError):
+        logger.info("Invalid token [%s %s]", method, path)
         return ApiResponse.unauthorized("Invalid token")
-    
+
     # Handle database errors
     if isinstance(exc, IntegrityError):
-        # Parse database error
-        error_info = str(exc.orig)
-        if "unique constraint" in error_info:
-            return ApiResponse.error(
-                "Duplicate entry - resource already exists",
-                409
-            )
-        elif "foreign key constraint" in error_info:
-            return ApiResponse.error(
-                "Foreign key constraint violation",
-                400
-            )
-        elif "not-null constraint" in error_info:
-            return ApiResponse.error(
-                "Required field is missing",
-                400
-            )
+        # Classify by SQLSTATE code (locale-independent, O(1) lookup)
+        code = getattr(exc.orig, "sqlstate", None) or getattr(exc.orig, "pgcode", None)
+        logger.warning("IntegrityError %s [%s %s]", code, method, path)
+        entry = _SQLSTATE_MAP.get(code)
+        if entry:
+            return ApiResponse.error(*entry)
         return ApiResponse.error("Database error", 500)
-    
+
     if isinstance(exc, SQLAlchemyError):
+        logger.error("Database error: %s [%s %s]", exc, method, path)
         return ApiResponse.error("Database error", 500)
-    
+
     # Handle validation errors
     if isinstance(exc, ValueError):
+        logger.info("ValueError: %s [%s %s]", exc, method, path)
         return ApiResponse.error(str(exc), 400)
-    
-    # Default error
+
+    # Default error — only unexpected exceptions pay for traceback capture
+    logger.error(
+        "Unhandled %s [%s %s]",
+        type(exc).__name__, method, path,
+        exc_info=True,
+        extra={"client": request.client}
+    )
     return ApiResponse.error(
         "Internal Server Error",
         500
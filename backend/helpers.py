@@ -1,56 +1,132 @@
+import asyncio
+import base64
 import bcrypt
 import jwt
-from datetime import datetime, timedelta, timezone
+import orjson
 from config import settings
-import uuid
+from datetime import datetime, timezone
 import math
 import os
-from typing import Dict, Any, Optional, Tuple
-import secrets
+import time
+import random
+import re
+import numpy as np
+from typing import Dict, Any, Optional, Tuple, Sequence
+
+# Signing material is fixed for the process lifetime; derive it once instead
+# of re-encoding the secret strings on every token operation.
+_JWT_SECRET = settings.jwt_secret.encode()
+_JWT_REFRESH_SECRET = settings.jwt_refresh_secret.encode()
+_JWT_ALGORITHM = "HS256"
+_JWT_ALGORITHMS = [_JWT_ALGORITHM]
+_ACCESS_TOKEN_TTL_SECONDS = settings.jwt_expire_minutes * 60
+_REFRESH_TOKEN_TTL_SECONDS = settings.jwt_refresh_expire_days * 86400
+_EMAIL_RE = re.compile(r'^[^\s@]+@[^\s@]+\.[^\s@]+$')
+_SENSITIVE_USER_FIELDS = frozenset(('password', 'refresh_token'))
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Approximate geohash cell height in km per precision, used to pick the
+# coarsest precision whose cells are at least as tall as a search radius
+_GEOHASH_CELL_KM = ((1, 5000.0), (2, 625.0), (3, 156.0), (4, 19.5), (5, 4.9), (6, 0.61))
+
+# [second, iso string] pair for the second-granularity timestamp cache
+_TS_CACHE = [0, ""]
+
+def _haversine(
+    lat1: float,
+    lon1: float,
+    lat2: float,
+    lon2: float,
+    _radians=math.radians,
+    _sin=math.sin,
+    _cos=math.cos,
+    _atan2=math.atan2,
+    _sqrt=math.sqrt,
+    _R=6371.0
+) -> float:
+    """Scalar haversine distance in km.
+
+    The math functions are bound as defaults so each call resolves them as
+    locals rather than two attribute lookups apiece - this sits inside
+    per-row loops on hot search paths. For many points against one origin,
+    Helpers.calculate_distances_batch is the right tool instead.
+    """
+    lat1_rad = _radians(lat1)
+    lat2_rad = _radians(lat2)
+    delta_lat = _radians(lat2 - lat1)
+    delta_lon = _radians(lon2 - lon1)
+
+    a = _sin(delta_lat / 2) ** 2 + \
+        _cos(lat1_rad) * _cos(lat2_rad) * \
+        _sin(delta_lon / 2) ** 2
+
+    c = 2 * _atan2(_sqrt(a), _sqrt(1 - a))
+
+    return _R * c
+
+def _uuid7_hex() -> str:
+    """UUIDv7 as 32 hex chars: millisecond timestamp + 74 random bits.
+
+    Time-ordered, so generated filenames sort by upload time; collision
+    avoidance doesn't need CSPRNG entropy per call.
+    """
+    ts_ms = time.time_ns() // 1_000_000
+    rand_a = random.getrandbits(12)
+    rand_b = random.getrandbits(62)
+    value = (ts_ms << 80) | (0x7 << 76) | (rand_a << 64) | (0b10 << 62) | rand_b
+    return f"{value:032x}"
 
 class Helpers:
     """Helper functions for password, JWT, distance, and data utilities"""
     
     @staticmethod
-    async def hash_password(password: str) -> str:
-        """Hash password using bcrypt"""
+    def _hash_password_sync(password: str) -> str:
         salt = bcrypt.gensalt(rounds=12)
         return bcrypt.hashpw(password.encode(), salt).decode()
-    
+
+    @staticmethod
+    async def hash_password(password: str) -> str:
+        """Hash password using bcrypt (off the event loop; ~100ms of CPU)"""
+        return await asyncio.to_thread(Helpers._hash_password_sync, password)
+
     @staticmethod
     async def compare_password(password: str, hashed_password: str) -> bool:
-        """Compare password with hash"""
-        return bcrypt.checkpw(password.encode(), hashed_password.encode())
+        """Compare password with hash (off the event loop)"""
+        return await asyncio.to_thread(
+            bcrypt.checkpw, password.encode(), hashed_password.encode()
+        )
     
     @staticmethod
     def generate_tokens(payload: Dict[str, Any]) -> Dict[str, str]:
         """Generate access and refresh tokens"""
-        now = datetime.now(timezone.utc)
-        
+        # PyJWT accepts integer unix timestamps for exp/iat directly,
+        # skipping the datetime construction and conversion round-trip
+        now = int(time.time())
+
         access_token_payload = {
             **payload,
-            "exp": now + timedelta(minutes=settings.jwt_expire_minutes),
+            "exp": now + _ACCESS_TOKEN_TTL_SECONDS,
             "iat": now,
             "type": "access"
         }
-        
+
         refresh_token_payload = {
             **payload,
-            "exp": now + timedelta(days=settings.jwt_refresh_expire_days),
+            "exp": now + _REFRESH_TOKEN_TTL_SECONDS,
             "iat": now,
             "type": "refresh"
         }
         
         access_token = jwt.encode(
             access_token_payload,
-            settings.jwt_secret,
-            algorithm="HS256"
+            _JWT_SECRET,
+            algorithm=_JWT_ALGORITHM
         )
         
         refresh_token = jwt.encode(
             refresh_token_payload,
-            settings.jwt_refresh_secret,
-            algorithm="HS256"
+            _JWT_REFRESH_SECRET,
+            algorithm=_JWT_ALGORITHM
         )
         
         return {
@@ -62,45 +138,193 @@ class Helpers:
     @staticmethod
     def verify_access_token(token: str) -> Dict[str, Any]:
         """Verify access token"""
-        return jwt.decode(token, settings.jwt_secret, algorithms=["HS256"])
+        return jwt.decode(token, _JWT_SECRET, algorithms=_JWT_ALGORITHMS)
     
     @staticmethod
     def verify_refresh_token(token: str) -> Dict[str, Any]:
         """Verify refresh token"""
-        return jwt.decode(token, settings.jwt_refresh_secret, algorithms=["HS256"])
+        return jwt.decode(token, _JWT_REFRESH_SECRET, algorithms=_JWT_ALGORITHMS)
     
+    # Bound straight to the module-level fast path; staticmethod wrapping a
+    # one-line delegate would just re-add a call frame per row
+    calculate_distance = staticmethod(_haversine)
+
     @staticmethod
-    def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-        """Calculate distance in kilometers using Haversine formula"""
+    def calculate_distances_batch(
+        lat1: float,
+        lon1: float,
+        lats2: Sequence[float],
+        lons2: Sequence[float]
+    ) -> np.ndarray:
+        """Calculate distances in kilometers from one point to many (vectorized Haversine)"""
         R = 6371  # Earth's radius in kilometers
-        
+
         lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        delta_lat = math.radians(lat2 - lat1)
-        delta_lon = math.radians(lon2 - lon1)
-        
-        a = math.sin(delta_lat / 2) ** 2 + \
-            math.cos(lat1_rad) * math.cos(lat2_rad) * \
-            math.sin(delta_lon / 2) ** 2
-        
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        
+        lats2_rad = np.radians(np.asarray(lats2, dtype=np.float64))
+        delta_lat = lats2_rad - lat1_rad
+        delta_lon = np.radians(np.asarray(lons2, dtype=np.float64)) - math.radians(lon1)
+
+        a = np.sin(delta_lat / 2) ** 2 + \
+            math.cos(lat1_rad) * np.cos(lats2_rad) * \
+            np.sin(delta_lon / 2) ** 2
+
+        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
         return R * c
-    
+
+    @staticmethod
+    def geohash(latitude: float, longitude: float, precision: int = 6) -> str:
+        """Encode coordinates as a geohash (6 chars ~ 1.2 km cell)
+
+        Points sharing a prefix are spatially close, so stored hashes can
+        bucket riders into grid cells before any exact distance math.
+        """
+        lat_lo, lat_hi = -90.0, 90.0
+        lon_lo, lon_hi = -180.0, 180.0
+        chars = []
+        ch = 0
+        bit = 0
+        even = True
+
+        while len(chars) < precision:
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                if longitude > mid:
+                    ch = ch * 2 + 1
+                    lon_lo = mid
+                else:
+                    ch = ch * 2
+                    lon_hi = mid
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                if latitude > mid:
+                    ch = ch * 2 + 1
+                    lat_lo = mid
+                else:
+                    ch = ch * 2
+                    lat_hi = mid
+            even = not even
+            bit += 1
+            if bit == 5:
+                chars.append(_GEOHASH_BASE32[ch])
+                bit = 0
+                ch = 0
+
+        return "".join(chars)
+
+    @staticmethod
+    def geohash_cover(latitude: float, longitude: float, radius_km: float) -> list:
+        """Geohash prefixes whose cells cover a radius around a point
+
+        Picks the coarsest precision with cells at least radius_km tall, so
+        sampling the bounding box corners and edges (9 points) is guaranteed
+        to touch every overlapped cell. Capped at precision 6 to match the
+        precision stored by Helpers.geohash.
+        """
+        precision = 1
+        for p, cell_km in _GEOHASH_CELL_KM:
+            if cell_km >= radius_km:
+                precision = p
+            else:
+                break
+
+        min_lat, max_lat, min_lon, max_lon = Helpers.bounding_box(
+            latitude, longitude, radius_km
+        )
+        lats = (max(min_lat, -90.0), latitude, min(max_lat, 90.0))
+        lons = (max(min_lon, -180.0), longitude, min(max_lon, 180.0))
+        return sorted({
+            Helpers.geohash(lat, lon, precision)
+            for lat in lats
+            for lon in lons
+        })
+
+    @staticmethod
+    def bounding_box(
+        latitude: float,
+        longitude: float,
+        radius_km: float
+    ) -> Tuple[float, float, float, float]:
+        """Bounding box (min_lat, max_lat, min_lon, max_lon) around a point
+
+        Slightly oversized near the poles, which is fine for a coarse
+        prefilter ahead of the exact Haversine check.
+        """
+        lat_delta = radius_km / 111.0
+        lon_delta = radius_km / (111.0 * max(math.cos(math.radians(latitude)), 0.01))
+        return (
+            latitude - lat_delta,
+            latitude + lat_delta,
+            longitude - lon_delta,
+            longitude + lon_delta
+        )
+
     @staticmethod
     def generate_unique_filename(original_filename: str) -> str:
-        """Generate unique filename for uploads"""
-        timestamp = datetime.now().timestamp()
-        random_str = secrets.token_hex(8)
-        extension = original_filename.split('.')[-1] if '.' in original_filename else ''
-        return f"{int(timestamp)}-{random_str}.{extension}"
+        """Generate unique, time-ordered filename for uploads"""
+        extension = original_filename.rpartition('.')[2] if '.' in original_filename else ''
+        return f"{_uuid7_hex()}.{extension}"
     
+    @staticmethod
+    def utc_now_isoformat() -> str:
+        """Current UTC time in ISO format, cached at second granularity
+
+        Response timestamps only carry second precision, so re-formatting
+        within the same second is wasted work on high-rate error paths.
+        """
+        second = int(time.time())
+        if second != _TS_CACHE[0]:
+            _TS_CACHE[1] = datetime.now(timezone.utc).isoformat()
+            _TS_CACHE[0] = second
+        return _TS_CACHE[1]
+
+    @staticmethod
+    def to_naive_utc(dt: Optional[datetime]) -> Optional[datetime]:
+        """Normalize a possibly tz-aware datetime to naive UTC
+
+        Client payloads can carry offsets (e.g. a trailing 'Z') while the
+        DateTime columns and utcnow() fill-ins are naive UTC; comparing the
+        two directly raises TypeError.
+        """
+        if dt is not None and dt.tzinfo is not None:
+            dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+        return dt
+
+    @staticmethod
+    def is_valid_email(email: str) -> bool:
+        """Quick email shape check (full validation is pydantic EmailStr)"""
+        return _EMAIL_RE.match(email) is not None
+
     @staticmethod
     def sanitize_user(user: Dict[str, Any]) -> Dict[str, Any]:
         """Remove sensitive fields from user dict"""
-        sensitive_fields = ['password', 'refresh_token']
-        return {k: v for k, v in user.items() if k not in sensitive_fields}
+        sanitized = dict(user)
+        for field in _SENSITIVE_USER_FIELDS:
+            sanitized.pop(field, None)
+        return sanitized
     
+    @staticmethod
+    def encode_cursor(timestamp, row_id: str) -> str:
+        """Opaque keyset-pagination token for a (timestamp, id) sort position
+
+        Composite cursors can't ride in a single query param the way the
+        location-history `before` timestamp does, so the pair travels as
+        url-safe base64 of a small JSON object.
+        """
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.isoformat()
+        raw = orjson.dumps({"ts": timestamp, "id": row_id})
+        return base64.urlsafe_b64encode(raw).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Optional[Tuple[datetime, str]]:
+        """Decode an encode_cursor token; None if malformed"""
+        try:
+            raw = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return datetime.fromisoformat(raw["ts"]), raw["id"]
+        except (ValueError, KeyError, TypeError):
+            return None
+
     @staticmethod
     def get_pagination_meta(page: int, limit: int, total: int) -> Dict[str, Any]:
         """Generate pagination metadata"""
@@ -3,12 +3,15 @@
 -- Enable PostGIS extension for geographic data
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 CREATE EXTENSION IF NOT EXISTS "postgis";
+CREATE EXTENSION IF NOT EXISTS "pg_trgm";
 
 -- Create enum types
-CREATE TYPE user_role AS ENUM ('user', 'admin');
+-- Labels must match the schemas.py enum values exactly; the ORM persists
+-- member values (see models._enum)
+CREATE TYPE user_role AS ENUM ('user', 'admin', 'moderator');
 CREATE TYPE ride_status AS ENUM ('scheduled', 'active', 'completed', 'cancelled');
 CREATE TYPE ride_difficulty AS ENUM ('easy', 'medium', 'hard');
-CREATE TYPE participant_status AS ENUM ('pending', 'accepted', 'rejected');
+CREATE TYPE participant_status AS ENUM ('pending', 'accepted', 'rejected', 'cancelled');
 
 -- Users table
 CREATE TABLE users (
@@ -26,6 +29,9 @@ CREATE TABLE users (
     is_profile_visible BOOLEAN DEFAULT true,
     current_latitude DECIMAL(10, 8),
     current_longitude DECIMAL(11, 8),
+    -- Index-backed twin of the lat/lng pair, kept in sync on location
+    -- writes; radius queries run ST_DWithin against it
+    current_location GEOGRAPHY(POINT, 4326),
     last_location_update TIMESTAMP,
     refresh_token TEXT,
     last_login_at TIMESTAMP,
@@ -41,6 +47,10 @@ CREATE TABLE rides (
     description TEXT,
     start_latitude DECIMAL(10, 8) NOT NULL,
     start_longitude DECIMAL(11, 8) NOT NULL,
+    -- See users.current_location; populated from the start lat/lng
+    start_location GEOGRAPHY(POINT, 4326),
+    -- Precision-6 geohash of the start point for coarse radius pruning
+    start_geohash VARCHAR(9),
     start_address VARCHAR(500) NOT NULL,
     end_latitude DECIMAL(10, 8) NOT NULL,
     end_longitude DECIMAL(11, 8) NOT NULL,
@@ -62,6 +72,8 @@ CREATE TABLE ride_participants (
     user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
     status participant_status DEFAULT 'pending',
     joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     UNIQUE(ride_id, user_id)
 );
 
@@ -92,31 +104,47 @@ CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_users_active ON users(is_active);
 CREATE INDEX idx_users_location ON users(current_latitude, current_longitude);
 CREATE INDEX idx_users_last_location_update ON users(last_location_update);
+-- Trigram index so substring search (ILIKE '%q%') is an index lookup
+-- instead of a sequential scan; the expression must match the one used
+-- by UserRepository.search
+CREATE INDEX idx_users_search_trgm ON users
+    USING GIN ((first_name || ' ' || last_name || ' ' || email) gin_trgm_ops);
 
 CREATE INDEX idx_rides_created_by ON rides(created_by);
-CREATE INDEX idx_rides_status ON rides(status);
-CREATE INDEX idx_rides_public ON rides(is_public);
-CREATE INDEX idx_rides_scheduled_date ON rides(scheduled_date_time);
+-- Partial index matching the discovery query: upcoming public rides
+-- ordered by date (replaces the low-cardinality status/is_public B-trees)
+CREATE INDEX idx_rides_public_scheduled ON rides(scheduled_date_time)
+    WHERE is_public = true AND status = 'scheduled';
+-- Keyset pagination seek for ride listings
+CREATE INDEX idx_rides_scheduled_id ON rides(scheduled_date_time, id);
 CREATE INDEX idx_rides_start_location ON rides(start_latitude, start_longitude);
 CREATE INDEX idx_rides_end_location ON rides(end_latitude, end_longitude);
 CREATE INDEX idx_rides_difficulty ON rides(difficulty);
+-- Geohash prefix filter for the non-PostGIS search fallback
+CREATE INDEX idx_rides_start_geohash ON rides(start_geohash);
 
 CREATE INDEX idx_ride_participants_ride_id ON ride_participants(ride_id);
 CREATE INDEX idx_ride_participants_user_id ON ride_participants(user_id);
 CREATE INDEX idx_ride_participants_status ON ride_participants(status);
+-- Membership checks only ever look at accepted participants
+CREATE INDEX idx_ride_participants_active ON ride_participants(ride_id, user_id)
+    WHERE status = 'accepted';
 
-CREATE INDEX idx_location_updates_user_id ON location_updates(user_id);
+-- Covering index: recent-track reads are index-only scans
+CREATE INDEX idx_location_updates_user_recent ON location_updates(user_id, timestamp)
+    INCLUDE (latitude, longitude);
 CREATE INDEX idx_location_updates_timestamp ON location_updates(timestamp);
-CREATE INDEX idx_location_updates_user_timestamp ON location_updates(user_id, timestamp);
+CREATE INDEX idx_location_updates_created_at ON location_updates(created_at);
 
 CREATE INDEX idx_drift_alerts_ride_id ON drift_alerts(ride_id);
 CREATE INDEX idx_drift_alerts_user_id ON drift_alerts(user_id);
 CREATE INDEX idx_drift_alerts_created_at ON drift_alerts(created_at);
 
--- Create geographic indexes for spatial queries
-CREATE INDEX idx_users_location_gist ON users USING GIST(ST_MakePoint(current_longitude, current_latitude));
-CREATE INDEX idx_rides_start_location_gist ON rides USING GIST(ST_MakePoint(start_longitude, start_latitude));
-CREATE INDEX idx_rides_end_location_gist ON rides USING GIST(ST_MakePoint(end_longitude, end_latitude));
+-- Create geographic indexes for spatial queries. These are on the
+-- geography columns the ST_DWithin queries actually filter on; the old
+-- ST_MakePoint expression indexes could never serve them.
+CREATE INDEX idx_users_current_geo ON users USING GIST(current_location);
+CREATE INDEX idx_rides_start_geo ON rides USING GIST(start_location);
 
 -- Create triggers to update updated_at timestamps
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -133,6 +161,9 @@ CREATE TRIGGER update_users_updated_at BEFORE UPDATE ON users
 CREATE TRIGGER update_rides_updated_at BEFORE UPDATE ON rides
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+CREATE TRIGGER update_ride_participants_updated_at BEFORE UPDATE ON ride_participants
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
 -- Insert sample admin user (password: Admin123!)
 INSERT INTO users (
     email, 
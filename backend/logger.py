@@ -1,51 +1,77 @@
 import logging
 import logging.handlers
 import os
+import queue
 from config import settings
-from datetime import datetime
+
+# Background listener that owns the (blocking) file handlers
+_listener: logging.handlers.QueueListener | None = None
 
 def setup_logger(name: str = "rideshare") -> logging.Logger:
-    """Setup logger with file and console handlers"""
-    
+    """Setup logger with queued file and console handlers"""
+
     logger = logging.getLogger(name)
+    if logger.handlers:
+        # Already configured (module import + main.py both call this)
+        return logger
+
     logger.setLevel(getattr(logging, settings.log_level))
-    
+
     # Create logs directory if it doesn't exist
     os.makedirs(os.path.dirname(settings.log_file) or ".", exist_ok=True)
-    
+
     # Log format
     formatter = logging.Formatter(
         fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
-    
+
     # File handler (rotating)
     file_handler = logging.handlers.RotatingFileHandler(
         filename=settings.log_file,
         maxBytes=5242880,  # 5MB
-        backupCount=5
+        backupCount=5,
+        delay=True
     )
     file_handler.setFormatter(formatter)
     file_handler.setLevel(logging.INFO)
-    logger.addHandler(file_handler)
-    
+
     # Error file handler
     error_file_handler = logging.handlers.RotatingFileHandler(
         filename=os.path.join(os.path.dirname(settings.log_file) or ".", "error.log"),
         maxBytes=5242880,
-        backupCount=5
+        backupCount=5,
+        delay=True
     )
     error_file_handler.setFormatter(formatter)
     error_file_handler.setLevel(logging.ERROR)
-    logger.addHandler(error_file_handler)
-    
+
+    handlers = [file_handler, error_file_handler]
+
     # Console handler (only in development)
     if settings.environment != "production":
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
         console_handler.setLevel(getattr(logging, settings.log_level))
-        logger.addHandler(console_handler)
-    
+        handlers.append(console_handler)
+
+    # Emit through a queue so disk IO and rotation happen off the request path
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    global _listener
+    _listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _listener.start()
+
     return logger
 
+def shutdown_logger():
+    """Flush and stop the background log listener"""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+
 logger = setup_logger()
@@ -1,14 +1,18 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+import orjson
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 import uvicorn
 import os
 
 from config import settings
-from logger import setup_logger
+from helpers import Helpers
+from logger import setup_logger, shutdown_logger
 from redis_client import redis_client
 from database import async_engine, Base
 from error_handler import install_exception_handlers
@@ -17,6 +21,7 @@ from slowapi.errors import RateLimitExceeded
 
 # Import route modules
 from routes import auth_routes, user_routes, ride_routes, location_routes
+from auth import token_invalidation_listener
 
 # Setup logger
 logger = setup_logger()
@@ -33,18 +38,30 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Redis connection failed: {e}")
     
-    # Create database tables
-    async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    logger.info("Database tables created")
-    
+    # Create database tables (dev convenience only; outside development the
+    # schema comes from init.sql provisioned at database first boot, so N
+    # workers don't race on DDL at startup)
+    if settings.environment == "development":
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        logger.info("Database tables created")
+
+    # Fan cross-worker token-cache evictions into this process
+    invalidation_task = asyncio.create_task(token_invalidation_listener())
+
     yield
-    
+
     # Shutdown
     logger.info("Shutting down application...")
+    invalidation_task.cancel()
+    try:
+        await invalidation_task
+    except asyncio.CancelledError:
+        pass
     await redis_client.disconnect()
     await async_engine.dispose()
     logger.info("Application shutdown complete")
+    shutdown_logger()
 
 # Create FastAPI app
 app = FastAPI(
@@ -54,6 +71,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url=f"/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -64,53 +82,51 @@ install_exception_handlers(app)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
 
-# CORS Middleware
+# CORS Middleware. Explicit origins (wildcard is rejected by browsers when
+# combined with credentials) and a 24h max_age so browsers cache the
+# preflight instead of paying an OPTIONS round-trip per call.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Change in production
+    allow_origins=tuple(settings.allowed_origins),
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    max_age=86400
 )
 
 # Trusted Host Middleware
 app.add_middleware(
     TrustedHostMiddleware,
-    allowed_hosts=["localhost", "127.0.0.1"]  # Add your hosts
+    allowed_hosts=tuple(settings.allowed_hosts)
 )
 
-# Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all incoming requests"""
-    logger.info(f"{request.method} {request.url.path}")
-    try:
-        response = await call_next(request)
-        return response
-    except Exception as e:
-        logger.error(f"Request error: {e}", exc_info=True)
-        raise
+# Compress list-shaped responses; small payloads aren't worth the CPU
+app.add_middleware(GZipMiddleware, minimum_size=500)
+
+# Root payload is static; encode it once at import
+_ROOT_RESPONSE_BYTES = orjson.dumps({
+    "message": "Welcome to RideShare API",
+    "version": settings.api_version,
+    "docs": "/docs",
+    "redoc": "/redoc"
+})
 
 # Health check endpoint
 @app.get("/health", tags=["Health"])
 async def health_check():
     """Health check endpoint"""
-    return {
+    # Only redis_connected is dynamic; skip response-model validation
+    return ORJSONResponse({
         "status": "ok",
         "environment": settings.environment,
         "redis_connected": redis_client.is_connected
-    }
+    })
 
 # Root endpoint
 @app.get("/", tags=["Info"])
 async def root():
     """API root endpoint"""
-    return {
-        "message": "Welcome to RideShare API",
-        "version": settings.api_version,
-        "docs": "/docs",
-        "redoc": "/redoc"
-    }
+    return Response(content=_ROOT_RESPONSE_BYTES, media_type="application/json")
 
 # Include route modules
 app.include_router(auth_routes.router)
@@ -122,20 +138,54 @@ app.include_router(location_routes.router)
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc: Exception):
     """Handle 404 errors"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=404,
         content={
             "success": False,
             "message": f"Route {request.url.path} not found",
-            "timestamp": __import__('datetime').datetime.utcnow().isoformat()
+            "timestamp": Helpers.utc_now_isoformat()
         }
     )
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=settings.port,
-        reload=settings.environment == "development",
-        log_level=settings.log_level.lower()
-    )
+    is_development = settings.environment == "development"
+    workers = 1 if is_development else (settings.uvicorn_workers or os.cpu_count())
+    log_level = settings.log_level.lower()
+
+    if is_development:
+        # reload requires the import-string form
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=settings.port,
+            reload=True,
+            loop="uvloop",
+            http="httptools",
+            access_log=True,
+            log_level=log_level
+        )
+    elif workers > 1:
+        # multiprocess workers also require the import string; each child
+        # process imports main once
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=settings.port,
+            workers=workers,
+            loop="uvloop",
+            http="httptools",
+            access_log=False,
+            log_level=log_level
+        )
+    else:
+        # Single worker: serve the app object already built above instead of
+        # having uvicorn re-import this module and construct it a second time
+        uvicorn.Server(uvicorn.Config(
+            app,
+            host="0.0.0.0",
+            port=settings.port,
+            loop="uvloop",
+            http="httptools",
+            access_log=False,
+            log_level=log_level
+        )).run()
@@ -1,15 +1,32 @@
 from sqlalchemy import (
-    Column, String, Integer, Float, Boolean, DateTime, 
-    ForeignKey, Enum, JSON, Text, Index, UniqueConstraint
+    Column, String, Integer, Float, Boolean, DateTime, Uuid,
+    ForeignKey, Enum, JSON, Text, Index, UniqueConstraint, text, FetchedValue
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from geoalchemy2 import Geometry
-import uuid
-from datetime import datetime
+from geoalchemy2 import Geography
 from database import Base
 from schemas import RideStatus, ParticipantStatus, RideDifficulty, UserRole
 
+# Native UUID primary key generated by Postgres (gen_random_uuid() is built
+# in since PG 13). Half the bytes of a String(36) PK in every row and index,
+# and no Python uuid4()+str() call per INSERT. as_uuid=False keeps string
+# values on the Python side, which is what the schemas and JWT payloads use.
+def _uuid_pk():
+    return Column(Uuid(as_uuid=False), primary_key=True, server_default=text("gen_random_uuid()"))
+
+# Persist enum member *values* (lowercase), not member names. init.sql - the
+# schema source outside development - declares its enum type labels as the
+# values, and SQLAlchemy's default of storing names would make every
+# enum-valued bind fail against it ("invalid input value for enum") and every
+# init.sql-seeded row raise LookupError on hydration.
+def _enum(enum_cls):
+    return Enum(enum_cls, values_callable=lambda e: [m.value for m in e])
+
+# Relationships are lazy="raise_on_sql": accessing one that was not eagerly
+# loaded raises instead of silently issuing an N+1 query. Query sites opt in
+# with selectinload()/joinedload() where the relationship is actually needed.
+
 # ============================================================================
 # USER MODEL
 # ============================================================================
@@ -21,9 +38,16 @@ class User(Base):
         Index('idx_users_email', 'email'),
         Index('idx_users_is_active', 'is_active'),
         Index('idx_users_is_profile_visible', 'is_profile_visible'),
+        Index('idx_users_current_geo', 'current_location', postgresql_using='gist'),
     )
-
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    # updated_at is trigger-maintained (server_onupdate=FetchedValue), and the
+    # default eager_defaults="auto" only fetches server values on INSERT - an
+    # UPDATE flush would expire the attribute, and the next read would try a
+    # sync lazy load (MissingGreenlet under AsyncSession). True extends the
+    # RETURNING fetch to UPDATE flushes as well.
+    __mapper_args__ = {"eager_defaults": True}
+
+    id = _uuid_pk()
     email = Column(String(255), nullable=False, unique=True)
     password = Column(String(255), nullable=False)
     first_name = Column(String(50), nullable=False)
@@ -34,20 +58,23 @@ class User(Base):
     social_links = Column(JSON, nullable=True, default={})
     is_active = Column(Boolean, default=True)
     is_profile_visible = Column(Boolean, default=True)
-    role = Column(Enum(UserRole), default=UserRole.USER)
+    role = Column(_enum(UserRole), default=UserRole.USER)
     refresh_token = Column(String(500), nullable=True)
     current_latitude = Column(Float, nullable=True)
     current_longitude = Column(Float, nullable=True)
+    # Index-backed twin of the lat/lng pair; kept in sync on location writes
+    # so radius queries can use ST_DWithin + GIST instead of a table scan.
+    current_location = Column(Geography('POINT', srid=4326, spatial_index=False), nullable=True)
     last_location_update = Column(DateTime, nullable=True)
     last_login_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), server_onupdate=FetchedValue(), nullable=False)
 
     # Relationships
-    rides_created = relationship("Ride", back_populates="creator", foreign_keys="Ride.created_by")
-    ride_participants = relationship("RideParticipant", back_populates="user")
-    locations = relationship("LocationUpdate", back_populates="user")
-    drift_alerts = relationship("DriftAlert", back_populates="user")
+    rides_created = relationship("Ride", back_populates="creator", foreign_keys="Ride.created_by", lazy="raise_on_sql")
+    ride_participants = relationship("RideParticipant", back_populates="user", lazy="raise_on_sql")
+    locations = relationship("LocationUpdate", back_populates="user", lazy="raise_on_sql")
+    drift_alerts = relationship("DriftAlert", back_populates="user", lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email})>"
@@ -60,35 +87,49 @@ class Ride(Base):
     __tablename__ = "rides"
     __table_args__ = (
         Index('idx_rides_created_by', 'created_by'),
-        Index('idx_rides_status', 'status'),
-        Index('idx_rides_is_public', 'is_public'),
-        Index('idx_rides_scheduled_date_time', 'scheduled_date_time'),
+        # Partial index matching the discovery query: upcoming public rides
+        # ordered by date. Smaller than separate B-trees on the low-cardinality
+        # status/is_public columns and covers the ORDER BY, skipping a sort.
+        Index('idx_rides_public_scheduled', 'scheduled_date_time',
+              postgresql_where=text("is_public = true AND status = 'scheduled'")),
         Index('idx_rides_start_location', 'start_latitude', 'start_longitude'),
+        # Keyset pagination for user-ride and search listings seeks on
+        # (scheduled_date_time, id) instead of scanning past OFFSET rows
+        Index('idx_rides_scheduled_id', 'scheduled_date_time', 'id'),
+        Index('idx_rides_start_geo', 'start_location', postgresql_using='gist'),
+        Index('idx_rides_start_geohash', 'start_geohash'),
     )
+    # Fetch the trigger-set updated_at on UPDATE flushes too; see User
+    __mapper_args__ = {"eager_defaults": True}
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = _uuid_pk()
     title = Column(String(100), nullable=False)
     description = Column(Text, nullable=True)
     start_latitude = Column(Float, nullable=False)
     start_longitude = Column(Float, nullable=False)
+    # See User.current_location; populated from start lat/lng on create/update.
+    start_location = Column(Geography('POINT', srid=4326, spatial_index=False), nullable=True)
+    # Precision-6 geohash of the start point (~0.6 km cell); prefix-filterable
+    # with the plain B-tree index for coarse radius pruning in search_rides
+    start_geohash = Column(String(9), nullable=True)
     start_address = Column(String(200), nullable=False)
     end_latitude = Column(Float, nullable=False)
     end_longitude = Column(Float, nullable=False)
     end_address = Column(String(200), nullable=False)
     scheduled_date_time = Column(DateTime, nullable=False)
-    status = Column(Enum(RideStatus), default=RideStatus.SCHEDULED)
+    status = Column(_enum(RideStatus), default=RideStatus.SCHEDULED)
     is_public = Column(Boolean, default=True)
     max_participants = Column(Integer, default=10)
     estimated_duration_minutes = Column(Integer, nullable=True)
-    difficulty = Column(Enum(RideDifficulty), default=RideDifficulty.MEDIUM)
-    created_by = Column(String(36), ForeignKey('users.id'), nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    difficulty = Column(_enum(RideDifficulty), default=RideDifficulty.MEDIUM)
+    created_by = Column(Uuid(as_uuid=False), ForeignKey('users.id'), nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), server_onupdate=FetchedValue(), nullable=False)
 
     # Relationships
-    creator = relationship("User", back_populates="rides_created", foreign_keys=[created_by])
-    participants = relationship("RideParticipant", back_populates="ride", cascade="all, delete-orphan")
-    drift_alerts = relationship("DriftAlert", back_populates="ride", cascade="all, delete-orphan")
+    creator = relationship("User", back_populates="rides_created", foreign_keys=[created_by], lazy="raise_on_sql")
+    participants = relationship("RideParticipant", back_populates="ride", cascade="all, delete-orphan", passive_deletes=True, lazy="raise_on_sql")
+    drift_alerts = relationship("DriftAlert", back_populates="ride", cascade="all, delete-orphan", passive_deletes=True, lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<Ride(id={self.id}, title={self.title})>"
@@ -104,19 +145,24 @@ class RideParticipant(Base):
         Index('idx_ride_participants_ride_id', 'ride_id'),
         Index('idx_ride_participants_user_id', 'user_id'),
         Index('idx_ride_participants_status', 'status'),
+        # Membership checks only ever look at accepted participants
+        Index('idx_ride_participants_active', 'ride_id', 'user_id',
+              postgresql_where=text("status = 'accepted'")),
     )
+    # Fetch the trigger-set updated_at on UPDATE flushes too; see User
+    __mapper_args__ = {"eager_defaults": True}
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    ride_id = Column(String(36), ForeignKey('rides.id'), nullable=False)
-    user_id = Column(String(36), ForeignKey('users.id'), nullable=False)
-    status = Column(Enum(ParticipantStatus), default=ParticipantStatus.PENDING)
-    joined_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    id = _uuid_pk()
+    ride_id = Column(Uuid(as_uuid=False), ForeignKey('rides.id', ondelete='CASCADE'), nullable=False)
+    user_id = Column(Uuid(as_uuid=False), ForeignKey('users.id'), nullable=False)
+    status = Column(_enum(ParticipantStatus), default=ParticipantStatus.PENDING)
+    joined_at = Column(DateTime, server_default=func.now(), nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), server_onupdate=FetchedValue(), nullable=False)
 
     # Relationships
-    ride = relationship("Ride", back_populates="participants")
-    user = relationship("User", back_populates="ride_participants")
+    ride = relationship("Ride", back_populates="participants", lazy="raise_on_sql")
+    user = relationship("User", back_populates="ride_participants", lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<RideParticipant(ride_id={self.ride_id}, user_id={self.user_id})>"
@@ -128,21 +174,24 @@ class RideParticipant(Base):
 class LocationUpdate(Base):
     __tablename__ = "location_updates"
     __table_args__ = (
-        Index('idx_location_updates_user_id', 'user_id'),
+        # Covering index for "recent track for user": the INCLUDEd coordinates
+        # let history reads come straight off the index (index-only scan).
+        Index('idx_location_updates_user_recent', 'user_id', 'timestamp',
+              postgresql_include=['latitude', 'longitude']),
         Index('idx_location_updates_timestamp', 'timestamp'),
         Index('idx_location_updates_created_at', 'created_at'),
     )
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String(36), ForeignKey('users.id'), nullable=False)
+    id = _uuid_pk()
+    user_id = Column(Uuid(as_uuid=False), ForeignKey('users.id'), nullable=False)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
     accuracy = Column(Float, nullable=True)
     timestamp = Column(DateTime, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     # Relationships
-    user = relationship("User", back_populates="locations")
+    user = relationship("User", back_populates="locations", lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<LocationUpdate(user_id={self.user_id}, timestamp={self.timestamp})>"
@@ -159,17 +208,17 @@ class DriftAlert(Base):
         Index('idx_drift_alerts_created_at', 'created_at'),
     )
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    ride_id = Column(String(36), ForeignKey('rides.id'), nullable=False)
-    user_id = Column(String(36), ForeignKey('users.id'), nullable=False)
+    id = _uuid_pk()
+    ride_id = Column(Uuid(as_uuid=False), ForeignKey('rides.id', ondelete='CASCADE'), nullable=False)
+    user_id = Column(Uuid(as_uuid=False), ForeignKey('users.id'), nullable=False)
     distance = Column(Float, nullable=False)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     # Relationships
-    ride = relationship("Ride", back_populates="drift_alerts")
-    user = relationship("User", back_populates="drift_alerts")
+    ride = relationship("Ride", back_populates="drift_alerts", lazy="raise_on_sql")
+    user = relationship("User", back_populates="drift_alerts", lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<DriftAlert(ride_id={self.ride_id}, user_id={self.user_id})>"
@@ -2,22 +2,31 @@ from slowapi import Limiter
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from fastapi import Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from config import settings
+from helpers import Helpers
 import logging
 
 logger = logging.getLogger(__name__)
 
-limiter = Limiter(key_func=get_remote_address)
+# Counters live in Redis so limits hold across uvicorn workers; with the
+# default in-memory storage each worker kept its own window, multiplying the
+# effective limit by the worker count. Falls back to per-process memory if
+# Redis is down rather than failing requests.
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=settings.redis_url,
+    in_memory_fallback_enabled=True
+)
 
 def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
     """Handle rate limit exceeded"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=429,
         content={
             "success": False,
             "message": "Too many requests. Please try again later.",
-            "timestamp": __import__('datetime').datetime.utcnow().isoformat()
+            "timestamp": Helpers.utc_now_isoformat()
         }
     )
 
@@ -1,5 +1,5 @@
-import redis
-import json
+import redis.asyncio as aioredis
+import orjson
 import logging
 from config import settings
 from typing import Any, Optional
@@ -8,21 +8,29 @@ logger = logging.getLogger(__name__)
 
 class RedisClient:
     """Redis client wrapper for caching"""
-    
+
     def __init__(self):
-        self.client: Optional[redis.Redis] = None
+        self.client: Optional[aioredis.Redis] = None
+        self.pool: Optional[aioredis.BlockingConnectionPool] = None
         self.is_connected = False
-    
-    async def connect(self) -> redis.Redis:
+
+    async def connect(self) -> aioredis.Redis:
         """Connect to Redis"""
         try:
-            self.client = redis.from_url(
+            # One shared pool for all app-level caching; BlockingConnectionPool
+            # queues callers when the pool is exhausted instead of raising,
+            # which keeps burst traffic from erroring out.
+            self.pool = aioredis.BlockingConnectionPool.from_url(
                 settings.redis_url,
                 password=settings.redis_password,
-                decode_responses=True
+                # Values stay bytes end-to-end; orjson emits and consumes
+                # bytes directly, so decoding to str would be a wasted pass
+                decode_responses=False,
+                max_connections=settings.redis_pool_size
             )
+            self.client = aioredis.Redis(connection_pool=self.pool)
             # Test connection
-            self.client.ping()
+            await self.client.ping()
             self.is_connected = True
             logger.info("Redis Client Connected")
             return self.client
@@ -30,7 +38,7 @@ class RedisClient:
             logger.error(f"Failed to connect to Redis: {e}")
             self.is_connected = False
             raise
-    
+
     async def set(
         self,
         key: str,
@@ -41,53 +49,65 @@ class RedisClient:
         if not self.is_connected:
             logger.warning("Redis not connected, skipping cache set")
             return False
-        
+
         try:
-            serialized_value = json.dumps(value)
+            serialized_value = orjson.dumps(value)
             if expire_seconds:
-                self.client.setex(key, expire_seconds, serialized_value)
+                await self.client.setex(key, expire_seconds, serialized_value)
             else:
-                self.client.set(key, serialized_value)
+                await self.client.set(key, serialized_value)
             return True
         except Exception as e:
             logger.error(f"Redis SET error: {e}")
             return False
-    
+
     async def get(self, key: str) -> Optional[Any]:
         """Get value from Redis"""
         if not self.is_connected:
             return None
-        
+
         try:
-            value = self.client.get(key)
-            return json.loads(value) if value else None
+            value = await self.client.get(key)
+            return orjson.loads(value) if value else None
         except Exception as e:
             logger.error(f"Redis GET error: {e}")
             return None
-    
+
+    async def get_many(self, keys: list) -> list:
+        """Get several values in one MGET round-trip"""
+        if not self.is_connected or not keys:
+            return [None] * len(keys)
+
+        try:
+            values = await self.client.mget(keys)
+            return [orjson.loads(v) if v else None for v in values]
+        except Exception as e:
+            logger.error(f"Redis MGET error: {e}")
+            return [None] * len(keys)
+
     async def delete(self, key: str) -> bool:
         """Delete key from Redis"""
         if not self.is_connected:
             return False
-        
+
         try:
-            self.client.delete(key)
+            await self.client.delete(key)
             return True
         except Exception as e:
             logger.error(f"Redis DELETE error: {e}")
             return False
-    
+
     async def exists(self, key: str) -> bool:
         """Check if key exists in Redis"""
         if not self.is_connected:
             return False
-        
+
         try:
-            return bool(self.client.exists(key))
+            return bool(await self.client.exists(key))
         except Exception as e:
             logger.error(f"Redis EXISTS error: {e}")
             return False
-    
+
     async def increment(
         self,
         key: str,
@@ -96,21 +116,45 @@ class RedisClient:
         """Increment counter in Redis"""
         if not self.is_connected:
             return 1
-        
+
         try:
-            value = self.client.incr(key)
-            if expire_seconds and value == 1:
-                self.client.expire(key, expire_seconds)
-            return value
+            # One round-trip for the INCR+EXPIRE pair; repeating EXPIRE is
+            # idempotent and cheaper than a conditional second RTT
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.incr(key)
+                if expire_seconds:
+                    pipe.expire(key, expire_seconds)
+                results = await pipe.execute()
+            return results[0]
         except Exception as e:
             logger.error(f"Redis INCR error: {e}")
             return 1
-    
+
+    async def publish(self, channel: str, message: str) -> bool:
+        """Publish a message to a pub/sub channel"""
+        if not self.is_connected:
+            return False
+
+        try:
+            await self.client.publish(channel, message)
+            return True
+        except Exception as e:
+            logger.error(f"Redis PUBLISH error: {e}")
+            return False
+
+    def pubsub(self):
+        """Pub/sub handle on the shared client (None when not connected)"""
+        if not self.is_connected:
+            return None
+        return self.client.pubsub()
+
     async def disconnect(self):
         """Disconnect from Redis"""
         if self.client:
-            self.client.close()
+            await self.client.aclose()
             self.is_connected = False
+        if self.pool:
+            await self.pool.disconnect()
 
 # Global instance
 redis_client = RedisClient()
@@ -1,13 +1,21 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from sqlalchemy import select, and_, func, desc
+from sqlalchemy import select, insert, update, delete, and_, func, desc, cast, exists
+from sqlalchemy.exc import ProgrammingError
+from geoalchemy2 import Geography
 from models import LocationUpdate, User, DriftAlert, Ride, RideParticipant
 from helpers import Helpers
+from config import settings
+import numpy as np
 from datetime import datetime, timedelta
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Batch size at which the binary COPY protocol beats a multi-row INSERT;
+# below this the extra protocol setup isn't worth it
+_COPY_THRESHOLD = 500
+
 class LocationRepository:
     """Location data access operations"""
 
@@ -24,25 +32,185 @@ class LocationRepository:
                 latitude=location_data["latitude"],
                 longitude=location_data["longitude"],
                 accuracy=location_data.get("accuracy"),
-                timestamp=location_data.get("timestamp") or datetime.utcnow()
+                timestamp=Helpers.to_naive_utc(location_data.get("timestamp")) or datetime.utcnow()
             )
             session.add(location)
+
+            # Update the user's current position with a direct UPDATE; no
+            # point SELECTing and hydrating the User row just to set columns
+            await session.execute(
+                update(User).where(User.id == user_id).values(
+                    current_latitude=location.latitude,
+                    current_longitude=location.longitude,
+                    current_location=func.ST_SetSRID(
+                        func.ST_MakePoint(location.longitude, location.latitude), 4326
+                    ),
+                    last_location_update=location.timestamp
+                )
+            )
             await session.flush()
-            
-            # Update user's current location
-            user = await session.get(User, user_id)
-            if user:
-                user.current_latitude = location.latitude
-                user.current_longitude = location.longitude
-                user.last_location_update = location.timestamp
-                await session.flush()
-            
+
             logger.info(f"Location updated for user {user_id}")
             return location
         except Exception as e:
             logger.error(f"Error creating location update: {e}")
             raise
 
+    @staticmethod
+    async def create_location_updates_batch(
+        session: AsyncSession,
+        user_id: str,
+        locations: list[dict]
+    ) -> int:
+        """Insert a batch of location updates in one statement
+
+        Per-row ORM adds pay a flush and a round-trip each; a single
+        executemany amortizes that across the whole GPS batch. Very large
+        batches (exports, offline-sync catch-ups) drop to asyncpg's binary
+        COPY protocol, which skips SQL parsing per row entirely; omitted
+        columns (id, created_at) still get their server defaults.
+        """
+        try:
+            # Normalize to naive UTC up front: client samples may be
+            # tz-aware while the utcnow() fill-ins are naive, and a mixed
+            # batch would make the max() comparison below raise TypeError
+            now = datetime.utcnow()
+            rows = [
+                {
+                    "user_id": user_id,
+                    "latitude": loc["latitude"],
+                    "longitude": loc["longitude"],
+                    "accuracy": loc.get("accuracy"),
+                    "timestamp": Helpers.to_naive_utc(loc.get("timestamp")) or now
+                }
+                for loc in locations
+            ]
+
+            if len(rows) >= _COPY_THRESHOLD:
+                # Raw asyncpg connection; the COPY joins the session's
+                # open transaction, so commit/rollback semantics hold
+                raw = await (await session.connection()).get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    "location_updates",
+                    records=[
+                        (r["user_id"], r["latitude"], r["longitude"],
+                         r["accuracy"], r["timestamp"])
+                        for r in rows
+                    ],
+                    columns=["user_id", "latitude", "longitude", "accuracy", "timestamp"]
+                )
+            else:
+                await session.execute(insert(LocationUpdate), rows)
+
+            # Only the newest sample moves the user's current position
+            latest = max(rows, key=lambda r: r["timestamp"])
+            await session.execute(
+                update(User).where(User.id == user_id).values(
+                    current_latitude=latest["latitude"],
+                    current_longitude=latest["longitude"],
+                    current_location=func.ST_SetSRID(
+                        func.ST_MakePoint(latest["longitude"], latest["latitude"]), 4326
+                    ),
+                    last_location_update=latest["timestamp"]
+                )
+            )
+            await session.flush()
+
+            logger.info(f"Inserted {len(rows)} location updates for user {user_id}")
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Error batch inserting location updates: {e}")
+            raise
+
+    @staticmethod
+    async def _build_history_stmt(
+        session: AsyncSession,
+        user_id: str,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        ride_id: str = None,
+        limit: int = 100,
+        offset: int = 0,
+        before: datetime = None
+    ):
+        """Build the location-history SELECT shared by the list and
+        streaming readers
+
+        Prefer the `before` keyset cursor for paging: OFFSET makes the DB
+        scan and discard all skipped rows on every deep page, while
+        `timestamp < before` is an O(limit) index seek on (user_id,
+        timestamp). `offset` is honored only when no cursor is given.
+        """
+        # Client filters may arrive tz-aware (trailing 'Z'); asyncpg can't
+        # bind those against the naive TIMESTAMP column, same as the write
+        # paths, so normalize before they reach the WHERE clause
+        start_date = Helpers.to_naive_utc(start_date)
+        end_date = Helpers.to_naive_utc(end_date)
+        before = Helpers.to_naive_utc(before)
+
+        stmt = select(LocationUpdate).where(
+            LocationUpdate.user_id == user_id
+        )
+
+        if before:
+            stmt = stmt.where(LocationUpdate.timestamp < before)
+        if start_date:
+            stmt = stmt.where(LocationUpdate.timestamp >= start_date)
+        if end_date:
+            stmt = stmt.where(LocationUpdate.timestamp <= end_date)
+
+        if ride_id:
+            # Two scalar fields are all we need; don't hydrate the Ride
+            ride = (await session.execute(
+                select(Ride.scheduled_date_time, Ride.estimated_duration_minutes)
+                .where(Ride.id == ride_id)
+            )).first()
+            if ride:
+                ride_start = ride.scheduled_date_time
+                ride_end = ride_start + timedelta(
+                    minutes=ride.estimated_duration_minutes or 120
+                )
+                stmt = stmt.where(
+                    and_(
+                        LocationUpdate.timestamp >= ride_start,
+                        LocationUpdate.timestamp <= ride_end
+                    )
+                )
+
+        stmt = stmt.order_by(desc(LocationUpdate.timestamp)).limit(limit)
+        if not before and offset:
+            stmt = stmt.offset(offset)
+        return stmt
+
+    @staticmethod
+    async def iter_user_location_history(
+        session: AsyncSession,
+        user_id: str,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        ride_id: str = None,
+        limit: int = 100,
+        offset: int = 0,
+        before: datetime = None
+    ):
+        """Stream user's location history
+
+        Server-side cursor with yield_per batches, so peak memory stays at
+        the batch size instead of the full page - the path to use for large
+        exports where `limit` runs into the thousands.
+        """
+        try:
+            stmt = await LocationRepository._build_history_stmt(
+                session, user_id, start_date, end_date, ride_id,
+                limit, offset, before
+            )
+            result = await session.stream(stmt.execution_options(yield_per=500))
+            async for location in result.scalars():
+                yield location
+        except Exception as e:
+            logger.error(f"Error streaming location history: {e}")
+            raise
+
     @staticmethod
     async def get_user_location_history(
         session: AsyncSession,
@@ -51,38 +219,26 @@ class LocationRepository:
         end_date: datetime = None,
         ride_id: str = None,
         limit: int = 100,
-        offset: int = 0
-    ) -> list[LocationUpdate]:
-        """Get user's location history"""
+        offset: int = 0,
+        before: datetime = None
+    ) -> tuple[list[LocationUpdate], int]:
+        """Get user's location history as (rows, total_count)
+
+        See iter_user_location_history for the streaming variant. The
+        total is COUNT(*) OVER() on the same statement - window functions
+        evaluate before LIMIT, so each page row carries the full filtered
+        count without a second scan.
+        """
         try:
-            stmt = select(LocationUpdate).where(
-                LocationUpdate.user_id == user_id
+            stmt = await LocationRepository._build_history_stmt(
+                session, user_id, start_date, end_date, ride_id,
+                limit, offset, before
             )
-            
-            if start_date:
-                stmt = stmt.where(LocationUpdate.timestamp >= start_date)
-            if end_date:
-                stmt = stmt.where(LocationUpdate.timestamp <= end_date)
-            
-            if ride_id:
-                # Get ride timing
-                ride = await session.get(Ride, ride_id)
-                if ride:
-                    ride_start = ride.scheduled_date_time
-                    ride_end = ride_start + timedelta(
-                        minutes=ride.estimated_duration_minutes or 120
-                    )
-                    stmt = stmt.where(
-                        and_(
-                            LocationUpdate.timestamp >= ride_start,
-                            LocationUpdate.timestamp <= ride_end
-                        )
-                    )
-            
-            stmt = stmt.order_by(desc(LocationUpdate.timestamp)).limit(limit).offset(offset)
-            
-            result = await session.execute(stmt)
-            return result.scalars().all()
+            stmt = stmt.add_columns(func.count().over().label("total"))
+            rows = (await session.execute(stmt)).all()
+            if not rows:
+                return [], 0
+            return [row.LocationUpdate for row in rows], rows[0].total
         except Exception as e:
             logger.error(f"Error getting location history: {e}")
             raise
@@ -95,19 +251,32 @@ class LocationRepository:
     ) -> list[dict]:
         """Get current locations of ride participants"""
         try:
-            # Verify user is a participant
-            participant_stmt = select(RideParticipant).where(
-                and_(
-                    RideParticipant.ride_id == ride_id,
-                    RideParticipant.user_id == user_id
+            # Membership check as an EXISTS index probe - no reason to
+            # hydrate a RideParticipant ORM object just to throw it away
+            is_member = await session.scalar(
+                select(
+                    exists().where(
+                        and_(
+                            RideParticipant.ride_id == ride_id,
+                            RideParticipant.user_id == user_id
+                        )
+                    )
                 )
             )
-            participant_result = await session.execute(participant_stmt)
-            if not participant_result.scalar_one_or_none():
+            if not is_member:
                 raise ValueError("User is not a participant in this ride")
-            
-            # Get all accepted participants' current locations
-            stmt = select(User).join(
+
+            # Columns-only select: seven scalar fields per participant
+            # instead of full User entities with identity-map bookkeeping
+            stmt = select(
+                User.id,
+                User.first_name,
+                User.last_name,
+                User.profile_picture_url,
+                User.current_latitude,
+                User.current_longitude,
+                User.last_location_update
+            ).join(
                 RideParticipant,
                 and_(
                     User.id == RideParticipant.user_id,
@@ -120,23 +289,21 @@ class LocationRepository:
                     User.current_longitude.isnot(None)
                 )
             )
-            
+
             result = await session.execute(stmt)
-            participants = result.scalars().all()
-            
-            locations = []
-            for participant in participants:
-                locations.append({
-                    "id": participant.id,
-                    "first_name": participant.first_name,
-                    "last_name": participant.last_name,
-                    "profile_picture_url": participant.profile_picture_url,
-                    "latitude": participant.current_latitude,
-                    "longitude": participant.current_longitude,
-                    "last_location_update": participant.last_location_update
-                })
-            
-            return locations
+
+            return [
+                {
+                    "id": row.id,
+                    "first_name": row.first_name,
+                    "last_name": row.last_name,
+                    "profile_picture_url": row.profile_picture_url,
+                    "latitude": row.current_latitude,
+                    "longitude": row.current_longitude,
+                    "last_location_update": row.last_location_update
+                }
+                for row in result
+            ]
         except Exception as e:
             logger.error(f"Error getting ride participant locations: {e}")
             raise
@@ -151,50 +318,131 @@ class LocationRepository:
     ) -> list[dict]:
         """Get nearby active users"""
         try:
-            stmt = select(User).where(
+            # Radius prune, distance, and ordering all happen in the DB
+            # against the GIST-indexed geography column; the old path loaded
+            # an arbitrary 50-row window and ran a Haversine per row, silently
+            # dropping true matches outside the window.
+            point = cast(
+                func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326),
+                Geography
+            )
+            distance_m = func.ST_Distance(User.current_location, point).label("distance_m")
+
+            stmt = select(
+                User.id,
+                User.first_name,
+                User.last_name,
+                User.profile_picture_url,
+                User.current_latitude,
+                User.current_longitude,
+                User.last_location_update,
+                distance_m
+            ).where(
                 and_(
                     User.is_active == True,
                     User.is_profile_visible == True,
-                    User.current_latitude.isnot(None),
-                    User.current_longitude.isnot(None)
+                    User.current_location.isnot(None),
+                    func.ST_DWithin(User.current_location, point, radius_km * 1000)
                 )
-            )
-            
+            ).order_by(distance_m)
+
             if exclude_user_id:
                 stmt = stmt.where(User.id != exclude_user_id)
-            
-            stmt = stmt.limit(50)
-            
+
             result = await session.execute(stmt)
-            users = result.scalars().all()
-            
-            # Calculate distances
-            nearby = []
-            for user in users:
-                distance = Helpers.calculate_distance(
-                    latitude, longitude,
-                    user.current_latitude, user.current_longitude
-                )
-                
-                if distance <= radius_km:
-                    nearby.append({
-                        "id": user.id,
-                        "first_name": user.first_name,
-                        "last_name": user.last_name,
-                        "profile_picture_url": user.profile_picture_url,
-                        "latitude": user.current_latitude,
-                        "longitude": user.current_longitude,
-                        "last_location_update": user.last_location_update,
-                        "distance_km": round(distance, 2)
-                    })
-            
-            # Sort by distance
-            nearby.sort(key=lambda x: x["distance_km"])
-            return nearby
+
+            return [
+                {
+                    "id": row.id,
+                    "first_name": row.first_name,
+                    "last_name": row.last_name,
+                    "profile_picture_url": row.profile_picture_url,
+                    "latitude": row.current_latitude,
+                    "longitude": row.current_longitude,
+                    "last_location_update": row.last_location_update,
+                    "distance_km": round(row.distance_m / 1000, 2)
+                }
+                for row in result
+            ]
+        except ProgrammingError:
+            # PostGIS not installed (plain-Postgres dev instance); fall back
+            # to a bounding-box prefilter plus one vectorized distance pass
+            await session.rollback()
+            logger.warning("PostGIS unavailable, using NumPy fallback for nearby users")
+            return await LocationRepository._get_nearby_users_fallback(
+                session, latitude, longitude, radius_km, exclude_user_id
+            )
         except Exception as e:
             logger.error(f"Error getting nearby users: {e}")
             raise
 
+    @staticmethod
+    async def _get_nearby_users_fallback(
+        session: AsyncSession,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        exclude_user_id: str = None
+    ) -> list[dict]:
+        """Nearby users without PostGIS
+
+        A coarse bounding box prunes candidates in SQL, then one vectorized
+        NumPy Haversine pass replaces the per-row trig calls - N interpreter
+        round-trips collapse into a handful of array ops.
+        """
+        min_lat, max_lat, min_lon, max_lon = Helpers.bounding_box(
+            latitude, longitude, radius_km
+        )
+
+        stmt = select(
+            User.id,
+            User.first_name,
+            User.last_name,
+            User.profile_picture_url,
+            User.current_latitude,
+            User.current_longitude,
+            User.last_location_update
+        ).where(
+            and_(
+                User.is_active == True,
+                User.is_profile_visible == True,
+                User.current_latitude.isnot(None),
+                User.current_longitude.isnot(None),
+                User.current_latitude.between(min_lat, max_lat),
+                User.current_longitude.between(min_lon, max_lon)
+            )
+        )
+
+        if exclude_user_id:
+            stmt = stmt.where(User.id != exclude_user_id)
+
+        rows = (await session.execute(stmt)).all()
+        if not rows:
+            return []
+
+        lats = np.fromiter(
+            (row.current_latitude for row in rows), dtype=np.float64, count=len(rows)
+        )
+        lons = np.fromiter(
+            (row.current_longitude for row in rows), dtype=np.float64, count=len(rows)
+        )
+        distances = Helpers.calculate_distances_batch(latitude, longitude, lats, lons)
+
+        return [
+            {
+                "id": rows[i].id,
+                "first_name": rows[i].first_name,
+                "last_name": rows[i].last_name,
+                "profile_picture_url": rows[i].profile_picture_url,
+                "latitude": rows[i].current_latitude,
+                "longitude": rows[i].current_longitude,
+                "last_location_update": rows[i].last_location_update,
+                "distance_km": round(float(distances[i]), 2)
+            }
+            for i in np.argsort(distances)
+            if distances[i] <= radius_km
+        ]
+
     @staticmethod
     async def check_drift_alerts(
         session: AsyncSession,
@@ -202,8 +450,18 @@ class LocationRepository:
     ) -> list[dict]:
         """Check for drift alerts in a ride"""
         try:
-            # Get all accepted ride participants with locations
-            stmt = select(User).join(
+            # Accepted participants with locations, plus the group centroid
+            # computed DB-side via window AVGs - same single round-trip, and
+            # no full User entities hauled over just to average two columns
+            stmt = select(
+                User.id,
+                User.first_name,
+                User.last_name,
+                User.current_latitude,
+                User.current_longitude,
+                func.avg(User.current_latitude).over().label("center_lat"),
+                func.avg(User.current_longitude).over().label("center_lon")
+            ).join(
                 RideParticipant,
                 and_(
                     User.id == RideParticipant.user_id,
@@ -216,46 +474,55 @@ class LocationRepository:
                     User.current_longitude.isnot(None)
                 )
             )
-            
-            result = await session.execute(stmt)
-            participants = result.scalars().all()
-            
+
+            participants = (await session.execute(stmt)).all()
+
             if len(participants) < 2:
                 return []
-            
-            # Calculate center point
-            center_lat = sum(p.current_latitude for p in participants) / len(participants)
-            center_lon = sum(p.current_longitude for p in participants) / len(participants)
-            
-            # Check for drift
-            from config import settings
+
+            center_lat = float(participants[0].center_lat)
+            center_lon = float(participants[0].center_lon)
+
+            lats = np.fromiter(
+                (p.current_latitude for p in participants),
+                dtype=np.float64, count=len(participants)
+            )
+            lons = np.fromiter(
+                (p.current_longitude for p in participants),
+                dtype=np.float64, count=len(participants)
+            )
+
+            distances = Helpers.calculate_distances_batch(
+                center_lat, center_lon, lats, lons
+            )
+
+            # One settings lookup and one vectorized comparison; the loop
+            # below only ever sees the (usually few) drifted participants
+            threshold = settings.drift_alert_distance_km
+            drifted = np.flatnonzero(distances > threshold)
+
             alerts = []
-            
-            for participant in participants:
-                distance = Helpers.calculate_distance(
-                    center_lat, center_lon,
-                    participant.current_latitude, participant.current_longitude
+            for i in drifted:
+                participant = participants[i]
+                distance = float(distances[i])
+                alert = DriftAlert(
+                    ride_id=ride_id,
+                    user_id=participant.id,
+                    distance=distance,
+                    latitude=participant.current_latitude,
+                    longitude=participant.current_longitude
                 )
-                
-                if distance > settings.drift_alert_distance_km:
-                    alert = DriftAlert(
-                        ride_id=ride_id,
-                        user_id=participant.id,
-                        distance=distance,
-                        latitude=participant.current_latitude,
-                        longitude=participant.current_longitude
-                    )
-                    session.add(alert)
-                    
-                    alerts.append({
-                        "user_id": participant.id,
-                        "user_name": f"{participant.first_name} {participant.last_name}",
-                        "distance_from_group": round(distance, 2),
-                        "max_allowed_distance": settings.drift_alert_distance_km,
-                        "latitude": participant.current_latitude,
-                        "longitude": participant.current_longitude,
-                        "timestamp": datetime.utcnow()
-                    })
+                session.add(alert)
+
+                alerts.append({
+                    "user_id": participant.id,
+                    "user_name": f"{participant.first_name} {participant.last_name}",
+                    "distance_from_group": round(distance, 2),
+                    "max_allowed_distance": threshold,
+                    "latitude": participant.current_latitude,
+                    "longitude": participant.current_longitude,
+                    "timestamp": datetime.utcnow()
+                })
             
             await session.flush()
             logger.warning(f"{len(alerts)} drift alerts detected for ride {ride_id}")
@@ -272,19 +539,17 @@ class LocationRepository:
         """Delete old location records"""
         try:
             cutoff_date = datetime.utcnow() - timedelta(days=older_than_days)
-            
-            stmt = select(LocationUpdate).where(
+
+            # One bulk DELETE instead of loading every expired row as an ORM
+            # object and deleting it individually; memory stays O(1) and the
+            # DB does an index-range scan on created_at
+            stmt = delete(LocationUpdate).where(
                 LocationUpdate.created_at < cutoff_date
-            )
+            ).execution_options(synchronize_session=False)
             result = await session.execute(stmt)
-            locations = result.scalars().all()
-            
-            for location in locations:
-                await session.delete(location)
-            
             await session.flush()
-            
-            deleted_count = len(locations)
+
+            deleted_count = result.rowcount
             logger.info(f"Cleaned {deleted_count} old location records")
             return deleted_count
         except Exception as e:
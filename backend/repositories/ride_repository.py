@@ -1,6 +1,9 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-from sqlalchemy import select, or_, and_, func, desc
+from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy import select, insert, update, delete, or_, and_, func, desc, exists, union, cast, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import ProgrammingError
+from geoalchemy2 import Geography
 from models import Ride, RideParticipant, User
 from schemas import RideStatus, ParticipantStatus
 from helpers import Helpers
@@ -16,19 +19,26 @@ class RideRepository:
         """Create new ride with creator as participant"""
         try:
             ride = Ride(**ride_data, created_by=created_by, status=RideStatus.SCHEDULED)
+            ride.start_location = func.ST_SetSRID(
+                func.ST_MakePoint(ride.start_longitude, ride.start_latitude), 4326
+            )
+            ride.start_geohash = Helpers.geohash(ride.start_latitude, ride.start_longitude)
             session.add(ride)
+            # flush() already brings back the server-generated id and
+            # timestamps via INSERT ... RETURNING; a refresh() here would
+            # just re-SELECT columns the ORM has in hand
             await session.flush()
-            await session.refresh(ride)
-            
-            # Add creator as participant
-            participant = RideParticipant(
-                ride_id=ride.id,
-                user_id=created_by,
-                status=ParticipantStatus.ACCEPTED
+
+            # Creator joins as accepted via a direct INSERT in the same
+            # transaction - no second ORM object or unit-of-work flush pass
+            await session.execute(
+                insert(RideParticipant).values(
+                    ride_id=ride.id,
+                    user_id=created_by,
+                    status=ParticipantStatus.ACCEPTED
+                )
             )
-            session.add(participant)
-            await session.flush()
-            
+
             logger.info(f"Ride created: {ride.id} by user {created_by}")
             return ride
         except Exception as e:
@@ -43,9 +53,12 @@ class RideRepository:
     ) -> Ride | None:
         """Find ride by ID with optional user info"""
         try:
+            # joinedload folds the many-to-one creator into the main SELECT;
+            # participants stay selectin (one extra query) but their users
+            # ride along in it as a JOIN - two statements total
             stmt = select(Ride).options(
-                selectinload(Ride.creator),
-                selectinload(Ride.participants).selectinload(RideParticipant.user)
+                joinedload(Ride.creator),
+                selectinload(Ride.participants).joinedload(RideParticipant.user)
             ).where(Ride.id == ride_id)
             
             result = await session.execute(stmt)
@@ -54,6 +67,28 @@ class RideRepository:
             logger.error(f"Error finding ride by ID: {e}")
             raise
 
+    @staticmethod
+    async def find_meta(session: AsyncSession, ride_id: str):
+        """Fetch ride scalar fields for permission/validation checks
+
+        Write paths only need a few columns; find_by_id eagerly loads the
+        creator and all participants and is reserved for read endpoints
+        that actually return them.
+        """
+        try:
+            stmt = select(
+                Ride.id,
+                Ride.created_by,
+                Ride.status,
+                Ride.max_participants,
+                Ride.is_public,
+                Ride.scheduled_date_time
+            ).where(Ride.id == ride_id)
+            return (await session.execute(stmt)).one_or_none()
+        except Exception as e:
+            logger.error(f"Error finding ride meta: {e}")
+            raise
+
     @staticmethod
     async def update(
         session: AsyncSession,
@@ -63,16 +98,25 @@ class RideRepository:
     ) -> Ride | None:
         """Update ride (only by creator)"""
         try:
-            ride = await RideRepository.find_by_id(session, ride_id, user_id)
+            # session.get skips the eager loads; the update only touches columns
+            ride = await session.get(Ride, ride_id)
             if not ride or ride.created_by != user_id:
                 return None
             
             for key, value in update_data.items():
                 if value is not None:
                     setattr(ride, key, value)
-            
+
+            if update_data.get("start_latitude") is not None or update_data.get("start_longitude") is not None:
+                ride.start_location = func.ST_SetSRID(
+                    func.ST_MakePoint(ride.start_longitude, ride.start_latitude), 4326
+                )
+                ride.start_geohash = Helpers.geohash(ride.start_latitude, ride.start_longitude)
+
+            # eager_defaults=True on the mapper makes this flush emit
+            # UPDATE ... RETURNING for the trigger-set updated_at, so no
+            # refresh() is needed and the later read can't lazy-load
             await session.flush()
-            await session.refresh(ride)
             logger.info(f"Ride updated: {ride_id}")
             return ride
         except Exception as e:
@@ -87,7 +131,8 @@ class RideRepository:
     ) -> bool:
         """Delete ride (only by creator)"""
         try:
-            ride = await RideRepository.find_by_id(session, ride_id)
+            # Cascades are passive_deletes, so no relationship loads needed
+            ride = await session.get(Ride, ride_id)
             if not ride or ride.created_by != user_id:
                 return False
             
@@ -108,15 +153,33 @@ class RideRepository:
         limit: int = 20,
         offset: int = 0,
         sort_by: str = "scheduled_date_time",
-        sort_order: str = "asc"
-    ) -> list[Ride]:
-        """Get user's rides (created or joined)"""
+        sort_order: str = "asc",
+        cursor: tuple = None
+    ) -> tuple[list[Ride], int]:
+        """Get user's rides (created or joined), returning (rides, total_count)
+
+        The total rides along on every row as COUNT(*) OVER() - the window
+        is evaluated over the filtered set before LIMIT, so pagination gets
+        the true total without a second counting query.
+
+        `cursor` is a decoded (scheduled_date_time, id) keyset pair. When
+        given, paging seeks past it on the (scheduled_date_time, id) index
+        instead of scanning and discarding OFFSET rows; it pins the sort to
+        scheduled_date_time and `offset` is ignored (same contract as the
+        location-history `before` cursor).
+        """
         try:
-            stmt = select(Ride).options(
-                selectinload(Ride.creator),
+            # creator is many-to-one, so joinedload keeps it in the main
+            # SELECT; participants (one-to-many) stay selectin to avoid
+            # fanning out the row count - two statements per page
+            stmt = select(
+                Ride,
+                func.count().over().label("total_count")
+            ).options(
+                joinedload(Ride.creator),
                 selectinload(Ride.participants)
             )
-            
+
             if ride_type == "created":
                 stmt = stmt.where(Ride.created_by == user_id)
             elif ride_type == "joined":
@@ -127,31 +190,45 @@ class RideRepository:
                     )
                 )
             else:  # "all"
-                stmt = stmt.where(
-                    or_(
-                        Ride.created_by == user_id,
-                        Ride.id.in_(
-                            select(RideParticipant.ride_id).where(
-                                RideParticipant.user_id == user_id
-                            )
-                        )
+                # UNION of two index scans (created_by and participant
+                # membership); the old OR + IN-subquery form tends to plan
+                # as a sequential scan over the whole rides table
+                ride_ids = union(
+                    select(Ride.id.label("id")).where(Ride.created_by == user_id),
+                    select(RideParticipant.ride_id.label("id")).where(
+                        RideParticipant.user_id == user_id
                     )
-                )
+                ).subquery()
+                stmt = stmt.join(ride_ids, Ride.id == ride_ids.c.id)
             
             if status:
                 stmt = stmt.where(Ride.status == status)
             
-            # Sort
-            sort_column = getattr(Ride, sort_by, Ride.scheduled_date_time)
-            if sort_order == "desc":
-                stmt = stmt.order_by(desc(sort_column))
+            # Sort; id tiebreaker makes the order deterministic so keyset
+            # pages never skip or repeat rows on equal timestamps
+            if cursor is not None:
+                key = tuple_(Ride.scheduled_date_time, Ride.id)
+                if sort_order == "desc":
+                    stmt = stmt.where(key < cursor).order_by(
+                        desc(Ride.scheduled_date_time), desc(Ride.id)
+                    )
+                else:
+                    stmt = stmt.where(key > cursor).order_by(
+                        Ride.scheduled_date_time, Ride.id
+                    )
+                stmt = stmt.limit(limit)
             else:
-                stmt = stmt.order_by(sort_column)
-            
-            stmt = stmt.limit(limit).offset(offset)
-            
-            result = await session.execute(stmt)
-            return result.scalars().all()
+                sort_column = getattr(Ride, sort_by, Ride.scheduled_date_time)
+                if sort_order == "desc":
+                    stmt = stmt.order_by(desc(sort_column), desc(Ride.id))
+                else:
+                    stmt = stmt.order_by(sort_column, Ride.id)
+                stmt = stmt.limit(limit).offset(offset)
+
+            rows = (await session.execute(stmt)).unique().all()
+            if not rows:
+                return [], 0
+            return [row.Ride for row in rows], rows[0].total_count
         except Exception as e:
             logger.error(f"Error getting user rides: {e}")
             raise
@@ -168,58 +245,140 @@ class RideRepository:
         is_public: bool = True,
         user_id: str = None,
         limit: int = 20,
-        offset: int = 0
-    ) -> list[Ride]:
-        """Search rides by location and filters"""
+        offset: int = 0,
+        cursor: tuple = None
+    ) -> tuple[list[Ride], int]:
+        """Search rides by location and filters, returning (rides, total_count)
+
+        Geo filtering runs DB-side as ST_DWithin against the GIST-indexed
+        start_location geography - an index probe that also computes the
+        reported distance in the same statement. Without PostGIS the
+        geohash-prefix prune + Python haversine refinement takes over.
+
+        `cursor` is a decoded (scheduled_date_time, id) keyset pair that
+        replaces `offset` when given - see get_user_rides.
+        """
         try:
-            stmt = select(Ride).options(
-                selectinload(Ride.creator),
-                selectinload(Ride.participants)
-            ).where(
-                and_(
-                    Ride.status == RideStatus.SCHEDULED,
-                    Ride.is_public == is_public
-                )
-            )
-            
-            # Location-based search using distance calculation
-            if latitude and longitude:
-                # In production, use PostGIS ST_DWithin for better performance
-                # For now, we'll filter in memory or use approximate distance
-                pass
-            
-            # Date range filter
+            filters = [
+                Ride.status == RideStatus.SCHEDULED,
+                Ride.is_public == is_public
+            ]
+            if cursor is not None:
+                # Keyset seek replaces OFFSET; results are always ordered
+                # (scheduled_date_time, id) ascending, so the predicate is
+                # shared by the PostGIS and geohash paths alike
+                filters.append(tuple_(Ride.scheduled_date_time, Ride.id) > cursor)
+                offset = 0
             if start_date:
-                stmt = stmt.where(Ride.scheduled_date_time >= start_date)
+                filters.append(Ride.scheduled_date_time >= start_date)
             if end_date:
-                stmt = stmt.where(Ride.scheduled_date_time <= end_date)
-            
-            # Difficulty filter
+                filters.append(Ride.scheduled_date_time <= end_date)
             if difficulty:
-                stmt = stmt.where(Ride.difficulty == difficulty)
-            
-            # Exclude user's own rides
+                filters.append(Ride.difficulty == difficulty)
             if user_id:
-                stmt = stmt.where(Ride.created_by != user_id)
-            
-            stmt = stmt.order_by(Ride.scheduled_date_time).limit(limit).offset(offset)
-            
-            result = await session.execute(stmt)
-            rides = result.scalars().all()
-            
-            # Calculate distances if location provided
+                filters.append(Ride.created_by != user_id)
+
             if latitude and longitude:
+                try:
+                    return await RideRepository._search_rides_postgis(
+                        session, filters, latitude, longitude, radius_km,
+                        limit, offset
+                    )
+                except ProgrammingError:
+                    # PostGIS not installed (plain-Postgres dev instance)
+                    await session.rollback()
+                    logger.warning(
+                        "PostGIS unavailable, using geohash fallback for ride search"
+                    )
+                    # Coarse radius prune on the indexed geohash prefix set;
+                    # the exact refinement below only sees surviving rows
+                    prefixes = Helpers.geohash_cover(latitude, longitude, radius_km)
+                    filters.append(
+                        or_(*[Ride.start_geohash.like(p + "%") for p in prefixes])
+                    )
+
+            stmt = select(
+                Ride,
+                func.count().over().label("total_count")
+            ).options(
+                joinedload(Ride.creator),
+                selectinload(Ride.participants)
+            ).where(and_(*filters)).order_by(
+                Ride.scheduled_date_time, Ride.id
+            ).limit(limit).offset(offset)
+
+            rows = (await session.execute(stmt)).unique().all()
+            if not rows:
+                return [], 0
+            total = rows[0].total_count
+            rides = [row.Ride for row in rows]
+
+            # Exact distance refinement on the pruned candidate set; the
+            # window total counts geohash candidates, so treat it as an
+            # upper bound on this (rarely taken) fallback path
+            if latitude and longitude:
+                within = []
                 for ride in rides:
-                    ride.distance_km = Helpers.calculate_distance(
+                    distance = Helpers.calculate_distance(
                         latitude, longitude,
                         ride.start_latitude, ride.start_longitude
                     )
-            
-            return rides
+                    if distance <= radius_km:
+                        ride.distance_km = distance
+                        within.append(ride)
+                total -= len(rides) - len(within)
+                rides = within
+
+            return rides, total
         except Exception as e:
             logger.error(f"Error searching rides: {e}")
             raise
 
+    @staticmethod
+    async def _search_rides_postgis(
+        session: AsyncSession,
+        filters: list,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        limit: int,
+        offset: int
+    ) -> tuple[list[Ride], int]:
+        """PostGIS ride search: GIST index probe + DB-computed distance"""
+        point = cast(
+            func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326),
+            Geography
+        )
+        distance_km = (
+            func.ST_Distance(Ride.start_location, point) / 1000.0
+        ).label("distance_km")
+
+        stmt = select(
+            Ride,
+            distance_km,
+            func.count().over().label("total_count")
+        ).options(
+            joinedload(Ride.creator),
+            selectinload(Ride.participants)
+        ).where(
+            and_(
+                *filters,
+                Ride.start_location.isnot(None),
+                func.ST_DWithin(Ride.start_location, point, radius_km * 1000)
+            )
+        ).order_by(Ride.scheduled_date_time, Ride.id).limit(limit).offset(offset)
+
+        rows = (await session.execute(stmt)).unique().all()
+        if not rows:
+            return [], 0
+
+        rides = []
+        for row in rows:
+            ride = row.Ride
+            ride.distance_km = round(row.distance_km, 2)
+            rides.append(ride)
+        return rides, rows[0].total_count
+
     @staticmethod
     async def get_ride_participants(
         session: AsyncSession,
@@ -227,8 +386,10 @@ class RideRepository:
     ) -> list[RideParticipant]:
         """Get ride participants with user info"""
         try:
+            # Single JOINed SELECT: user is many-to-one, so joinedload
+            # brings it back without the selectin follow-up query
             stmt = select(RideParticipant).options(
-                selectinload(RideParticipant.user)
+                joinedload(RideParticipant.user)
             ).where(
                 RideParticipant.ride_id == ride_id
             ).order_by(RideParticipant.joined_at)
@@ -247,45 +408,70 @@ class RideRepository:
     ) -> RideParticipant | None:
         """Join ride (with validations)"""
         try:
-            # Check ride exists and is available
-            ride = await RideRepository.find_by_id(session, ride_id)
-            if not ride or ride.status != RideStatus.SCHEDULED:
+            # Lock the ride row before counting: under READ COMMITTED two
+            # concurrent joiners would otherwise both see count <
+            # max_participants before either commits and oversubscribe the
+            # ride (the unique constraint only stops same-user duplicates).
+            # FOR UPDATE serializes joins per ride; the lock is held until
+            # the service commits. Only scalar columns are selected - no
+            # participant/User hydration on this path.
+            ride_row = (await session.execute(
+                select(
+                    Ride.status,
+                    Ride.max_participants,
+                    Ride.is_public
+                ).where(Ride.id == ride_id).with_for_update()
+            )).one_or_none()
+            if not ride_row or ride_row.status != RideStatus.SCHEDULED:
                 return None
-            
-            # Check participant count
-            participant_count_stmt = select(func.count(RideParticipant.id)).where(
+
+            # Separate statement on purpose: it runs on a fresh snapshot
+            # taken after the lock is acquired, so it sees any join that
+            # committed while we were waiting. count(*) instead of
+            # count(id): no per-row NOT NULL check, and the accepted-
+            # participants partial index alone can answer it.
+            accepted_count = select(func.count()).select_from(RideParticipant).where(
                 and_(
                     RideParticipant.ride_id == ride_id,
                     RideParticipant.status == ParticipantStatus.ACCEPTED
                 )
-            )
-            participant_count_result = await session.execute(participant_count_stmt)
-            participant_count = participant_count_result.scalar() or 0
-            
-            if participant_count >= ride.max_participants:
-                return None  # Ride is full
-            
-            # Check if already a participant
-            existing_stmt = select(RideParticipant).where(
-                and_(
-                    RideParticipant.ride_id == ride_id,
-                    RideParticipant.user_id == user_id
+            ).scalar_subquery()
+
+            checks = (await session.execute(
+                select(
+                    accepted_count.label("accepted_count"),
+                    exists().where(
+                        and_(
+                            RideParticipant.ride_id == ride_id,
+                            RideParticipant.user_id == user_id
+                        )
+                    ).label("already_joined")
                 )
-            )
-            existing_result = await session.execute(existing_stmt)
-            if existing_result.scalar_one_or_none():
+            )).one()
+            if checks.accepted_count >= ride_row.max_participants:
+                return None  # Ride is full
+            if checks.already_joined:
                 return None  # Already participant
-            
-            # Add participant
-            participant = RideParticipant(
+
+            desired_status = (
+                ParticipantStatus.ACCEPTED if ride_row.is_public else ParticipantStatus.PENDING
+            )
+
+            # ON CONFLICT DO NOTHING keeps a concurrent duplicate join
+            # idempotent even without the capacity race
+            ins = pg_insert(RideParticipant).values(
                 ride_id=ride_id,
                 user_id=user_id,
-                status=ParticipantStatus.ACCEPTED if ride.is_public else ParticipantStatus.PENDING
-            )
-            session.add(participant)
+                status=desired_status
+            ).on_conflict_do_nothing(
+                index_elements=["ride_id", "user_id"]
+            ).returning(RideParticipant)
+
+            participant = (await session.execute(ins)).scalars().one_or_none()
+            if participant is None:
+                return None  # Duplicate join raced us to the insert
+
             await session.flush()
-            await session.refresh(participant)
-            
             logger.info(f"User {user_id} joined ride {ride_id}")
             return participant
         except Exception as e:
@@ -300,21 +486,19 @@ class RideRepository:
     ) -> bool:
         """Leave ride"""
         try:
-            stmt = select(RideParticipant).where(
+            # Direct DELETE and branch on rowcount: the old SELECT-then-
+            # delete pair hydrated the row only to immediately discard it
+            stmt = delete(RideParticipant).where(
                 and_(
                     RideParticipant.ride_id == ride_id,
                     RideParticipant.user_id == user_id
                 )
-            )
+            ).execution_options(synchronize_session=False)
             result = await session.execute(stmt)
-            participant = result.scalar_one_or_none()
-            
-            if not participant:
+
+            if result.rowcount == 0:
                 return False
-            
-            await session.delete(participant)
-            await session.flush()
-            
+
             logger.info(f"User {user_id} left ride {ride_id}")
             return True
         except Exception as e:
@@ -332,26 +516,23 @@ class RideRepository:
         """Update participant status (only by creator)"""
         try:
             # Verify updater is ride creator
-            ride = await RideRepository.find_by_id(session, ride_id)
+            ride = await RideRepository.find_meta(session, ride_id)
             if not ride or ride.created_by != updated_by:
                 return None
             
-            stmt = select(RideParticipant).where(
+            # One UPDATE ... RETURNING replaces the SELECT + mutate + flush
+            # + refresh sequence; a None result means no such participant
+            stmt = update(RideParticipant).where(
                 and_(
                     RideParticipant.ride_id == ride_id,
                     RideParticipant.user_id == user_id
                 )
-            )
-            result = await session.execute(stmt)
-            participant = result.scalar_one_or_none()
-            
-            if not participant:
+            ).values(status=status).returning(RideParticipant)
+
+            participant = (await session.execute(stmt)).scalars().one_or_none()
+            if participant is None:
                 return None
-            
-            participant.status = status
-            await session.flush()
-            await session.refresh(participant)
-            
+
             logger.info(f"Participant {user_id} status updated to {status} in ride {ride_id}")
             return participant
         except Exception as e:
@@ -368,48 +549,43 @@ class RideRepository:
         """Invite users to ride"""
         try:
             # Verify inviter is ride creator
-            ride = await RideRepository.find_by_id(session, ride_id)
+            ride = await RideRepository.find_meta(session, ride_id)
             if not ride or ride.created_by != invited_by:
                 raise ValueError("Only ride creator can invite users")
             
-            invitations = []
-            for user_id in user_ids:
-                try:
-                    # Check if already participant
-                    existing_stmt = select(RideParticipant).where(
-                        and_(
-                            RideParticipant.ride_id == ride_id,
-                            RideParticipant.user_id == user_id
-                        )
-                    )
-                    existing_result = await session.execute(existing_stmt)
-                    if existing_result.scalar_one_or_none():
-                        invitations.append({
-                            "user_id": user_id,
-                            "status": "already_participant"
-                        })
-                        continue
-                    
-                    # Add as pending participant
-                    participant = RideParticipant(
-                        ride_id=ride_id,
-                        user_id=user_id,
-                        status=ParticipantStatus.PENDING
+            # One SELECT for the existing membership set, one multi-row
+            # INSERT for the rest - two statements regardless of batch size
+            # (the old loop paid a SELECT and an INSERT+flush per invitee)
+            existing_stmt = select(RideParticipant.user_id).where(
+                and_(
+                    RideParticipant.ride_id == ride_id,
+                    RideParticipant.user_id.in_(user_ids)
+                )
+            )
+            existing = set((await session.execute(existing_stmt)).scalars())
+
+            rows = [
+                {"ride_id": ride_id, "user_id": uid, "status": ParticipantStatus.PENDING}
+                for uid in user_ids
+                if uid not in existing
+            ]
+            if rows:
+                # ON CONFLICT DO NOTHING keeps concurrent double-invites idempotent
+                await session.execute(
+                    pg_insert(RideParticipant).values(rows).on_conflict_do_nothing(
+                        index_elements=["ride_id", "user_id"]
                     )
-                    session.add(participant)
-                    await session.flush()
-                    
-                    invitations.append({
-                        "user_id": user_id,
-                        "status": "invited"
-                    })
-                except Exception as e:
-                    invitations.append({
-                        "user_id": user_id,
-                        "status": "failed",
-                        "error": str(e)
-                    })
-            
+                )
+                await session.flush()
+
+            invitations = [
+                {
+                    "user_id": uid,
+                    "status": "already_participant" if uid in existing else "invited"
+                }
+                for uid in user_ids
+            ]
+
             logger.info(f"{len(user_ids)} users invited to ride {ride_id}")
             return invitations
         except Exception as e:
@@ -423,7 +599,9 @@ class RideRepository:
     ) -> int:
         """Get accepted participant count for ride"""
         try:
-            stmt = select(func.count(RideParticipant.id)).where(
+            # count(*) lets this run as an index-only scan on the accepted-
+            # participants partial index (see models.RideParticipant)
+            stmt = select(func.count()).select_from(RideParticipant).where(
                 and_(
                     RideParticipant.ride_id == ride_id,
                     RideParticipant.status == ParticipantStatus.ACCEPTED
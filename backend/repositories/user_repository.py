@@ -1,12 +1,31 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from sqlalchemy import select, or_, and_, func
+from sqlalchemy import select, update, or_, and_, func, lambda_stmt
 from models import User, Ride, RideParticipant
 from schemas import UserRole
+import hashlib
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Refresh-token lookup cache: sha256(token) -> (user_id, expires). The
+# users.refresh_token column has no index, so the fallback SELECT is a
+# sequential scan; a hit turns it into a primary-key session.get. Entries
+# are keyed by hash (raw tokens never sit in process memory), invalidated
+# on rotation/revocation, and re-validated against the loaded row so a
+# stale entry can never authenticate an outdated token. Same shape as the
+# verified-token cache in auth.py.
+_RT_CACHE: dict = {}
+_RT_BY_USER: dict = {}
+_RT_CACHE_TTL = 300
+_RT_CACHE_MAX_SIZE = 50000
+
+def _rt_cache_invalidate(user_id: str) -> None:
+    token_hash = _RT_BY_USER.pop(user_id, None)
+    if token_hash:
+        _RT_CACHE.pop(token_hash, None)
+
 class UserRepository:
     """User data access operations"""
 
@@ -25,12 +44,23 @@ class UserRepository:
             raise
 
     @staticmethod
-    async def find_by_id(session: AsyncSession, user_id: str) -> User | None:
-        """Find user by ID"""
+    async def find_by_id(
+        session: AsyncSession,
+        user_id: str,
+        options: list = None
+    ) -> User | None:
+        """Find user by ID
+
+        Relationships are lazy="raise_on_sql" (see models), so callers that
+        need one must opt in, e.g.
+        ``find_by_id(session, uid, options=[selectinload(User.rides_created)])``.
+        """
         try:
-            stmt = select(User).where(User.id == user_id)
-            result = await session.execute(stmt)
-            return result.scalar_one_or_none()
+            # session.get answers from the session's identity map when the
+            # row is already loaded; sessions are request-scoped (get_db),
+            # so repeat lookups of the same user within one request -
+            # auth dependency plus route handler - cost zero extra SELECTs
+            return await session.get(User, user_id, options=options)
         except Exception as e:
             logger.error(f"Error finding user by ID: {e}")
             raise
@@ -39,7 +69,10 @@ class UserRepository:
     async def find_by_email(session: AsyncSession, email: str) -> User | None:
         """Find user by email"""
         try:
-            stmt = select(User).where(User.email == email)
+            # lambda_stmt caches the constructed/compiled statement across
+            # calls, with `email` extracted as the bind parameter - this
+            # runs on every login, so skip rebuilding the select() tree
+            stmt = lambda_stmt(lambda: select(User).where(User.email == email))
             result = await session.execute(stmt)
             return result.scalar_one_or_none()
         except Exception as e:
@@ -50,9 +83,34 @@ class UserRepository:
     async def find_by_refresh_token(session: AsyncSession, refresh_token: str) -> User | None:
         """Find user by refresh token"""
         try:
-            stmt = select(User).where(User.refresh_token == refresh_token)
+            token_hash = hashlib.sha256(refresh_token.encode()).hexdigest()
+            cached = _RT_CACHE.get(token_hash)
+            if cached:
+                user_id, expires = cached
+                if expires > time.time():
+                    user = await session.get(User, user_id)
+                    # Re-check the live row; the cache is advisory only
+                    if user and user.refresh_token == refresh_token:
+                        return user
+                _RT_CACHE.pop(token_hash, None)
+                _RT_BY_USER.pop(user_id, None)
+
+            # Same cached-statement treatment as find_by_email; runs on
+            # every token refresh
+            stmt = lambda_stmt(
+                lambda: select(User).where(User.refresh_token == refresh_token)
+            )
             result = await session.execute(stmt)
-            return result.scalar_one_or_none()
+            user = result.scalar_one_or_none()
+
+            if user:
+                if len(_RT_CACHE) >= _RT_CACHE_MAX_SIZE:
+                    _RT_CACHE.clear()
+                    _RT_BY_USER.clear()
+                _rt_cache_invalidate(user.id)
+                _RT_CACHE[token_hash] = (user.id, time.time() + _RT_CACHE_TTL)
+                _RT_BY_USER[user.id] = token_hash
+            return user
         except Exception as e:
             logger.error(f"Error finding user by refresh token: {e}")
             raise
@@ -61,16 +119,20 @@ class UserRepository:
     async def update(session: AsyncSession, user_id: str, update_data: dict) -> User | None:
         """Update user"""
         try:
-            user = await UserRepository.find_by_id(session, user_id)
-            if not user:
+            clean = {k: v for k, v in update_data.items() if v is not None}
+            if not clean:
+                # Nothing to write (client resubmitted unchanged fields);
+                # skip the flush and serve the row from the identity map
+                return await session.get(User, user_id)
+
+            # One UPDATE ... RETURNING instead of SELECT + mutate + flush
+            # + refresh - a single round-trip that hands back the full
+            # updated row, trigger-set updated_at included
+            stmt = update(User).where(User.id == user_id).values(**clean).returning(User)
+            user = (await session.execute(stmt)).scalars().one_or_none()
+            if user is None:
                 return None
-            
-            for key, value in update_data.items():
-                if value is not None:
-                    setattr(user, key, value)
-            
-            await session.flush()
-            await session.refresh(user)
+
             logger.info(f"User updated: {user_id}")
             return user
         except Exception as e:
@@ -81,12 +143,15 @@ class UserRepository:
     async def update_password(session: AsyncSession, user_id: str, hashed_password: str) -> bool:
         """Update user password"""
         try:
-            user = await UserRepository.find_by_id(session, user_id)
-            if not user:
+            # Write-only path: a direct UPDATE branching on rowcount beats
+            # SELECTing and hydrating the full row just to set one column
+            result = await session.execute(
+                update(User).where(User.id == user_id)
+                .values(password=hashed_password)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
                 return False
-            
-            user.password = hashed_password
-            await session.flush()
             logger.info(f"Password updated for user: {user_id}")
             return True
         except Exception as e:
@@ -97,13 +162,13 @@ class UserRepository:
     async def set_refresh_token(session: AsyncSession, user_id: str, refresh_token: str) -> bool:
         """Set refresh token"""
         try:
-            user = await UserRepository.find_by_id(session, user_id)
-            if not user:
-                return False
-            
-            user.refresh_token = refresh_token
-            await session.flush()
-            return True
+            _rt_cache_invalidate(user_id)
+            result = await session.execute(
+                update(User).where(User.id == user_id)
+                .values(refresh_token=refresh_token)
+                .execution_options(synchronize_session=False)
+            )
+            return result.rowcount > 0
         except Exception as e:
             logger.error(f"Error setting refresh token: {e}")
             raise
@@ -112,13 +177,13 @@ class UserRepository:
     async def clear_refresh_token(session: AsyncSession, user_id: str) -> bool:
         """Clear refresh token"""
         try:
-            user = await UserRepository.find_by_id(session, user_id)
-            if not user:
-                return False
-            
-            user.refresh_token = None
-            await session.flush()
-            return True
+            _rt_cache_invalidate(user_id)
+            result = await session.execute(
+                update(User).where(User.id == user_id)
+                .values(refresh_token=None)
+                .execution_options(synchronize_session=False)
+            )
+            return result.rowcount > 0
         except Exception as e:
             logger.error(f"Error clearing refresh token: {e}")
             raise
@@ -127,63 +192,123 @@ class UserRepository:
     async def get_user_stats(session: AsyncSession, user_id: str) -> dict:
         """Get user statistics"""
         try:
-            # Count rides created
-            rides_created_stmt = select(func.count(Ride.id)).where(Ride.created_by == user_id)
-            rides_created_result = await session.execute(rides_created_stmt)
-            rides_created = rides_created_result.scalar() or 0
+            # One statement instead of three: both ride counts come from a
+            # single scan of the user's rides via FILTER, and the join count
+            # rides along as a scalar subquery - 1 round-trip, shared pages
+            rides_agg = select(
+                func.count().label("rides_created"),
+                func.count().filter(Ride.status == "completed").label("completed_rides")
+            ).where(Ride.created_by == user_id).subquery()
 
-            # Count rides joined
-            rides_joined_stmt = select(func.count(RideParticipant.id)).where(
+            rides_joined = select(func.count()).select_from(RideParticipant).where(
                 and_(
                     RideParticipant.user_id == user_id,
                     RideParticipant.status == "accepted"
                 )
-            )
-            rides_joined_result = await session.execute(rides_joined_stmt)
-            rides_joined = rides_joined_result.scalar() or 0
+            ).scalar_subquery()
 
-            # Count completed rides
-            completed_rides_stmt = select(func.count(Ride.id)).where(
-                and_(
-                    Ride.created_by == user_id,
-                    Ride.status == "completed"
-                )
+            stmt = select(
+                rides_agg.c.rides_created,
+                rides_agg.c.completed_rides,
+                rides_joined.label("rides_joined")
             )
-            completed_rides_result = await session.execute(completed_rides_stmt)
-            completed_rides = completed_rides_result.scalar() or 0
+            row = (await session.execute(stmt)).one()
 
             return {
-                "rides_created": rides_created,
-                "rides_joined": rides_joined,
-                "completed_rides": completed_rides
+                "rides_created": row.rides_created or 0,
+                "rides_joined": row.rides_joined or 0,
+                "completed_rides": row.completed_rides or 0
             }
         except Exception as e:
             logger.error(f"Error getting user stats: {e}")
             raise
 
+    @staticmethod
+    async def get_user_with_stats(
+        session: AsyncSession,
+        user_id: str
+    ) -> tuple[User | None, dict]:
+        """Fetch a user row and their ride stats in one round-trip
+
+        asyncio.gather can't help here - one AsyncSession can't multiplex
+        queries, and borrowing a second pooled connection per profile read
+        costs more than it saves - so the two lookups are fused into a
+        single statement instead: the stats aggregates ride along with the
+        user row as subqueries.
+        """
+        try:
+            rides_agg = select(
+                func.count().label("rides_created"),
+                func.count().filter(Ride.status == "completed").label("completed_rides")
+            ).where(Ride.created_by == user_id).subquery()
+
+            rides_joined = select(func.count()).select_from(RideParticipant).where(
+                and_(
+                    RideParticipant.user_id == user_id,
+                    RideParticipant.status == "accepted"
+                )
+            ).scalar_subquery()
+
+            stmt = select(
+                User,
+                rides_agg.c.rides_created,
+                rides_agg.c.completed_rides,
+                rides_joined.label("rides_joined")
+            ).where(User.id == user_id)
+
+            row = (await session.execute(stmt)).one_or_none()
+            if row is None:
+                return None, {}
+            return row.User, {
+                "rides_created": row.rides_created or 0,
+                "rides_joined": row.rides_joined or 0,
+                "completed_rides": row.completed_rides or 0
+            }
+        except Exception as e:
+            logger.error(f"Error getting user with stats: {e}")
+            raise
+
     @staticmethod
     async def search(
         session: AsyncSession,
         query: str,
         limit: int = 20,
         offset: int = 0
-    ) -> list[User]:
-        """Search users by name or email"""
+    ) -> tuple[list, int]:
+        """Search users by name or email, returning (rows, total_count)
+
+        Rows are plain column tuples - the serializer reads six fields, so
+        hydrating full User entities with identity-map bookkeeping per row
+        would be wasted work. The total rides along on every row as
+        COUNT(*) OVER(), so the pagination count shares the filter scan
+        instead of re-running it as a second query.
+        """
         try:
-            stmt = select(User).where(
+            # Single concatenated ILIKE matching the trigram GIN index
+            # (idx_users_search_trgm in init.sql); the old triple-OR form
+            # was a sequential scan since leading wildcards defeat B-trees
+            stmt = select(
+                User.id,
+                User.email,
+                User.first_name,
+                User.last_name,
+                User.profile_picture_url,
+                User.is_profile_visible,
+                func.count().over().label("total")
+            ).where(
                 and_(
                     User.is_active == True,
                     User.is_profile_visible == True,
-                    or_(
-                        User.first_name.ilike(f"%{query}%"),
-                        User.last_name.ilike(f"%{query}%"),
-                        User.email.ilike(f"%{query}%")
+                    (User.first_name + ' ' + User.last_name + ' ' + User.email).ilike(
+                        f"%{query}%"
                     )
                 )
             ).limit(limit).offset(offset)
-            
-            result = await session.execute(stmt)
-            return result.scalars().all()
+
+            rows = (await session.execute(stmt)).all()
+            if not rows:
+                return [], 0
+            return rows, rows[0].total
         except Exception as e:
             logger.error(f"Error searching users: {e}")
             raise
@@ -192,12 +317,13 @@ class UserRepository:
     async def deactivate(session: AsyncSession, user_id: str) -> bool:
         """Deactivate user account"""
         try:
-            user = await UserRepository.find_by_id(session, user_id)
-            if not user:
+            result = await session.execute(
+                update(User).where(User.id == user_id)
+                .values(is_active=False)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
                 return False
-            
-            user.is_active = False
-            await session.flush()
             logger.info(f"User deactivated: {user_id}")
             return True
         except Exception as e:
@@ -205,17 +331,39 @@ class UserRepository:
             raise
 
     @staticmethod
-    async def update_last_login(session: AsyncSession, user_id: str) -> bool:
-        """Update last login time"""
+    async def deactivate_and_revoke(session: AsyncSession, user_id: str) -> bool:
+        """Deactivate user account and clear their refresh token
+
+        One UPDATE covers both columns - one round-trip, one WAL record,
+        one row lock - where calling deactivate and clear_refresh_token
+        separately would pay each twice.
+        """
         try:
-            from datetime import datetime
-            user = await UserRepository.find_by_id(session, user_id)
-            if not user:
+            _rt_cache_invalidate(user_id)
+            result = await session.execute(
+                update(User).where(User.id == user_id)
+                .values(is_active=False, refresh_token=None)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
                 return False
-            
-            user.last_login_at = datetime.utcnow()
-            await session.flush()
+            logger.info(f"User deactivated and refresh token revoked: {user_id}")
             return True
+        except Exception as e:
+            logger.error(f"Error deactivating user: {e}")
+            raise
+
+    @staticmethod
+    async def update_last_login(session: AsyncSession, user_id: str) -> bool:
+        """Update last login time"""
+        try:
+            # func.now() stamps the time server-side in the same statement
+            result = await session.execute(
+                update(User).where(User.id == user_id)
+                .values(last_login_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+            return result.rowcount > 0
         except Exception as e:
             logger.error(f"Error updating last login: {e}")
             raise
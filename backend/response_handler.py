@@ -1,7 +1,31 @@
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from typing import Any, Optional, List, Dict
-from datetime import datetime
+from helpers import Helpers
 from schemas import ErrorDetail, SuccessResponse, ErrorResponse
+import orjson
+import time
+
+# Serialized bodies for default-message error responses, keyed by status
+# code as (second, bytes). These are the most frequent error replies; the
+# cache skips the dict build and JSON encode entirely within each second
+# (the payload only changes with its second-granularity timestamp).
+_DEFAULT_ERROR_CACHE: Dict[int, tuple] = {}
+
+def _cached_error_response(message: str, status_code: int) -> Response:
+    second = int(time.time())
+    entry = _DEFAULT_ERROR_CACHE.get(status_code)
+    if entry is None or entry[0] != second:
+        entry = (second, orjson.dumps({
+            "success": False,
+            "message": message,
+            "timestamp": Helpers.utc_now_isoformat()
+        }))
+        _DEFAULT_ERROR_CACHE[status_code] = entry
+    return Response(
+        content=entry[1],
+        status_code=status_code,
+        media_type="application/json"
+    )
 
 class ApiResponse:
     """Standard API response formatter"""
@@ -11,76 +35,82 @@ class ApiResponse:
         data: Any = None,
         message: str = "Success",
         status_code: int = 200
-    ) -> JSONResponse:
+    ) -> ORJSONResponse:
         """Return success response"""
         response = {
             "success": True,
             "message": message,
             "data": data,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": Helpers.utc_now_isoformat()
         }
-        return JSONResponse(content=response, status_code=status_code)
+        return ORJSONResponse(content=response, status_code=status_code)
 
     @staticmethod
     def error(
         message: str = "Internal Server Error",
         status_code: int = 500,
         errors: Optional[List[Dict[str, str]]] = None
-    ) -> JSONResponse:
+    ) -> ORJSONResponse:
         """Return error response"""
         response = {
             "success": False,
             "message": message,
             "errors": errors,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": Helpers.utc_now_isoformat()
         }
-        return JSONResponse(content=response, status_code=status_code)
+        return ORJSONResponse(content=response, status_code=status_code)
 
     @staticmethod
     def validation_error(
         errors: List[Dict[str, str]]
-    ) -> JSONResponse:
+    ) -> ORJSONResponse:
         """Return validation error response"""
         response = {
             "success": False,
             "message": "Validation Error",
             "errors": errors,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": Helpers.utc_now_isoformat()
         }
-        return JSONResponse(content=response, status_code=400)
+        return ORJSONResponse(content=response, status_code=400)
 
     @staticmethod
     def unauthorized(
         message: str = "Unauthorized"
-    ) -> JSONResponse:
+    ) -> Response:
         """Return unauthorized response"""
+        if message == "Unauthorized":
+            return _cached_error_response(message, 401)
         response = {
             "success": False,
             "message": message,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": Helpers.utc_now_isoformat()
         }
-        return JSONResponse(content=response, status_code=401)
+        return ORJSONResponse(content=response, status_code=401)
 
     @staticmethod
     def forbidden(
         message: str = "Forbidden"
-    ) -> JSONResponse:
+    ) -> Response:
         """Return forbidden response"""
+        if message == "Forbidden":
+            return _cached_error_response(message, 403)
         response = {
             "success": False,
             "message": message,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": Helpers.utc_now_isoformat()
         }
-        return JSONResponse(content=response, status_code=403)
+        return ORJSONResponse(content=response, status_code=403)
 
     @staticmethod
     def not_found(
         message: str = "Resource not found"
-    ) -> JSONResponse:
+    ) -> Response:
         """Return not found response"""
+        if message == "Resource not found":
+            return _cached_error_response(message, 404)
         response = {
             "success": False,
             "message": message,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": Helpers.utc_now_isoformat()
         }
-        return JSONResponse(content=response, status_code=404)
+        return ORJSONResponse(content=response, status_code=404)
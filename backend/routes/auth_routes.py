@@ -1,6 +1,5 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import EmailStr
 from schemas import (
     UserRegistrationRequest, UserLoginRequest, RefreshTokenRequest,
     ChangePasswordRequest, UserResponse, UserWithTokenResponse
@@ -9,10 +8,10 @@ from services.user_service import UserService
 from database import get_db
 from auth import get_current_user
 from response_handler import ApiResponse
-from exceptions import ConflictError, UnauthorizedError, BadRequestError, NotFoundError
-import logging
 
-logger = logging.getLogger(__name__)
+# Error translation lives in error_handler.install_exception_handlers:
+# RideShareException subclasses map to their status/message there, so
+# handlers below are happy-path only - no per-route try/except boilerplate.
 
 router = APIRouter(prefix="/api/v1/auth", tags=["Authentication"])
 
@@ -28,32 +27,20 @@ async def register(
     session: AsyncSession = Depends(get_db)
 ):
     """Register new user"""
-    try:
-        result = await UserService.register_user(
-            session,
-            email=request.email,
-            password=request.password,
-            first_name=request.first_name,
-            last_name=request.last_name,
-            phone=request.phone
-        )
-        
-        return ApiResponse.success(
-            data=result,
-            message="User registered successfully",
-            status_code=201
-        )
-    except ConflictError as e:
-        return ApiResponse.error(
-            message=e.message,
-            status_code=e.status_code
-        )
-    except Exception as e:
-        logger.error(f"Registration error: {e}")
-        return ApiResponse.error(
-            message="Registration failed",
-            status_code=500
-        )
+    result = await UserService.register_user(
+        session,
+        email=request.email,
+        password=request.password,
+        first_name=request.first_name,
+        last_name=request.last_name,
+        phone=request.phone
+    )
+
+    return ApiResponse.success(
+        data=result,
+        message="User registered successfully",
+        status_code=201
+    )
 
 @router.post(
     "/login",
@@ -66,25 +53,16 @@ async def login(
     session: AsyncSession = Depends(get_db)
 ):
     """Login user"""
-    try:
-        result = await UserService.login_user(
-            session,
-            email=request.email,
-            password=request.password
-        )
-        
-        return ApiResponse.success(
-            data=result,
-            message="Login successful"
-        )
-    except UnauthorizedError as e:
-        return ApiResponse.unauthorized(e.message)
-    except Exception as e:
-        logger.error(f"Login error: {e}")
-        return ApiResponse.error(
-            message="Login failed",
-            status_code=500
-        )
+    result = await UserService.login_user(
+        session,
+        email=request.email,
+        password=request.password
+    )
+
+    return ApiResponse.success(
+        data=result,
+        message="Login successful"
+    )
 
 @router.post(
     "/refresh",
@@ -97,24 +75,15 @@ async def refresh_token(
     session: AsyncSession = Depends(get_db)
 ):
     """Refresh access token"""
-    try:
-        result = await UserService.refresh_tokens(
-            session,
-            refresh_token=request.refresh_token
-        )
-        
-        return ApiResponse.success(
-            data=result,
-            message="Token refreshed successfully"
-        )
-    except UnauthorizedError as e:
-        return ApiResponse.unauthorized(e.message)
-    except Exception as e:
-        logger.error(f"Token refresh error: {e}")
-        return ApiResponse.error(
-            message="Token refresh failed",
-            status_code=500
-        )
+    result = await UserService.refresh_tokens(
+        session,
+        refresh_token=request.refresh_token
+    )
+
+    return ApiResponse.success(
+        data=result,
+        message="Token refreshed successfully"
+    )
 
 @router.post(
     "/logout",
@@ -126,18 +95,11 @@ async def logout(
     session: AsyncSession = Depends(get_db)
 ):
     """Logout user"""
-    try:
-        await UserService.logout_user(session, current_user["user_id"])
-        
-        return ApiResponse.success(
-            message="Logout successful"
-        )
-    except Exception as e:
-        logger.error(f"Logout error: {e}")
-        return ApiResponse.error(
-            message="Logout failed",
-            status_code=500
-        )
+    await UserService.logout_user(session, current_user["user_id"])
+
+    return ApiResponse.success(
+        message="Logout successful"
+    )
 
 @router.put(
     "/change-password",
@@ -150,30 +112,16 @@ async def change_password(
     session: AsyncSession = Depends(get_db)
 ):
     """Change user password"""
-    try:
-        await UserService.change_password(
-            session,
-            user_id=current_user["user_id"],
-            current_password=request.current_password,
-            new_password=request.new_password
-        )
-        
-        return ApiResponse.success(
-            message="Password changed successfully"
-        )
-    except BadRequestError as e:
-        return ApiResponse.error(
-            message=e.message,
-            status_code=e.status_code
-        )
-    except NotFoundError as e:
-        return ApiResponse.not_found(e.message)
-    except Exception as e:
-        logger.error(f"Change password error: {e}")
-        return ApiResponse.error(
-            message="Password change failed",
-            status_code=500
-        )
+    await UserService.change_password(
+        session,
+        user_id=current_user["user_id"],
+        current_password=request.current_password,
+        new_password=request.new_password
+    )
+
+    return ApiResponse.success(
+        message="Password changed successfully"
+    )
 
 @router.get(
     "/me",
@@ -186,21 +134,12 @@ async def get_current_user_profile(
     session: AsyncSession = Depends(get_db)
 ):
     """Get current user profile"""
-    try:
-        user = await UserService.get_user_profile(
-            session,
-            user_id=current_user["user_id"]
-        )
-        
-        return ApiResponse.success(
-            data=user,
-            message="User profile retrieved successfully"
-        )
-    except NotFoundError as e:
-        return ApiResponse.not_found(e.message)
-    except Exception as e:
-        logger.error(f"Get current user error: {e}")
-        return ApiResponse.error(
-            message="Failed to get user profile",
-            status_code=500
-        )
+    user = await UserService.get_user_profile(
+        session,
+        user_id=current_user["user_id"]
+    )
+
+    return ApiResponse.success(
+        data=user,
+        message="User profile retrieved successfully"
+    )
@@ -5,12 +5,11 @@ from services.location_service import LocationService
 from database import get_db
 from auth import get_current_user
 from response_handler import ApiResponse
-from exceptions import NotFoundError, BadRequestError
 from helpers import Helpers
-import logging
 from datetime import datetime
 
-logger = logging.getLogger(__name__)
+# Error translation is centralized in error_handler (BadRequestError and
+# friends carry their status/message); handlers stay happy-path only.
 
 router = APIRouter(prefix="/api/v1/locations", tags=["Locations"])
 
@@ -27,26 +26,19 @@ async def update_location(
     session: AsyncSession = Depends(get_db)
 ):
     """Update user location"""
-    try:
-        location = await LocationService.update_user_location(
-            session,
-            current_user["user_id"],
-            latitude=request.latitude,
-            longitude=request.longitude,
-            accuracy=request.accuracy,
-            timestamp=request.timestamp
-        )
-        
-        return ApiResponse.success(
-            data=location,
-            message="Location updated successfully"
-        )
-    except Exception as e:
-        logger.error(f"Update location error: {e}")
-        return ApiResponse.error(
-            message="Location update failed",
-            status_code=500
-        )
+    location = await LocationService.update_user_location(
+        session,
+        current_user["user_id"],
+        latitude=request.latitude,
+        longitude=request.longitude,
+        accuracy=request.accuracy,
+        timestamp=request.timestamp
+    )
+
+    return ApiResponse.success(
+        data=location,
+        message="Location updated successfully"
+    )
 
 @router.post(
     "/batch-update",
@@ -61,23 +53,18 @@ async def batch_update_locations(
     session: AsyncSession = Depends(get_db)
 ):
     """Batch update locations"""
-    try:
-        results = await LocationService.batch_update_locations(
-            session,
-            current_user["user_id"],
-            [loc.dict() for loc in request.locations]
-        )
-        
-        return ApiResponse.success(
-            data=results,
-            message="Batch location update completed"
-        )
-    except Exception as e:
-        logger.error(f"Batch update locations error: {e}")
-        return ApiResponse.error(
-            message="Batch location update failed",
-            status_code=500
-        )
+    results = await LocationService.batch_update_locations(
+        session,
+        current_user["user_id"],
+        # model_dump is pydantic v2's Rust-backed dumper; .dict() goes
+        # through the deprecated v1 shim on every point in the batch
+        [loc.model_dump() for loc in request.locations]
+    )
+
+    return ApiResponse.success(
+        data=results,
+        message="Batch location update completed"
+    )
 
 @router.get(
     "/ride/{ride_id}",
@@ -91,28 +78,16 @@ async def get_ride_locations(
     session: AsyncSession = Depends(get_db)
 ):
     """Get ride participant locations"""
-    try:
-        locations = await LocationService.get_ride_participant_locations(
-            session,
-            ride_id,
-            current_user["user_id"]
-        )
-        
-        return ApiResponse.success(
-            data=locations,
-            message="Ride locations retrieved successfully"
-        )
-    except BadRequestError as e:
-        return ApiResponse.error(
-            message=e.message,
-            status_code=e.status_code
-        )
-    except Exception as e:
-        logger.error(f"Get ride locations error: {e}")
-        return ApiResponse.error(
-            message="Failed to get ride locations",
-            status_code=500
-        )
+    locations = await LocationService.get_ride_participant_locations(
+        session,
+        ride_id,
+        current_user["user_id"]
+    )
+
+    return ApiResponse.success(
+        data=locations,
+        message="Ride locations retrieved successfully"
+    )
 
 @router.get(
     "/history",
@@ -121,48 +96,45 @@ async def get_ride_locations(
     description="Get user's location history with optional filtering"
 )
 async def get_location_history(
-    start_date: str = Query(None),
-    end_date: str = Query(None),
+    # Typed datetime params: pydantic's Rust-backed parser handles the ISO
+    # conversion (including the 'Z' suffix) during request validation, and
+    # bad input gets a proper 422 instead of a ValueError-driven 500 here
+    start_date: datetime = Query(None),
+    end_date: datetime = Query(None),
     ride_id: str = Query(None),
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
+    before: datetime = Query(None, description="Keyset cursor: return entries older than this timestamp"),
     current_user: dict = Depends(get_current_user),
     session: AsyncSession = Depends(get_db)
 ):
     """Get location history"""
-    try:
-        start_date_obj = datetime.fromisoformat(start_date) if start_date else None
-        end_date_obj = datetime.fromisoformat(end_date) if end_date else None
-        
-        history = await LocationService.get_user_location_history(
-            session,
-            current_user["user_id"],
-            start_date=start_date_obj,
-            end_date=end_date_obj,
-            ride_id=ride_id,
-            limit=limit,
-            offset=offset
-        )
-        
-        pagination = Helpers.get_pagination_meta(
-            page=(offset // limit) + 1,
-            limit=limit,
-            total=len(history)
-        )
-        
-        return ApiResponse.success(
-            data={
-                "history": history,
-                "pagination": pagination
-            },
-            message="Location history retrieved successfully"
-        )
-    except Exception as e:
-        logger.error(f"Get location history error: {e}")
-        return ApiResponse.error(
-            message="Failed to get location history",
-            status_code=500
-        )
+    history, total = await LocationService.get_user_location_history(
+        session,
+        current_user["user_id"],
+        start_date=start_date,
+        end_date=end_date,
+        ride_id=ride_id,
+        limit=limit,
+        offset=offset,
+        before=before
+    )
+
+    pagination = Helpers.get_pagination_meta(
+        page=(offset // limit) + 1,
+        limit=limit,
+        total=total
+    )
+
+    return ApiResponse.success(
+        data={
+            "history": history,
+            "pagination": pagination,
+            # Pass this back as `before` to fetch the next (older) page
+            "next_cursor": history[-1]["timestamp"] if len(history) == limit else None
+        },
+        message="Location history retrieved successfully"
+    )
 
 @router.get(
     "/nearby",
@@ -178,25 +150,18 @@ async def get_nearby_users(
     session: AsyncSession = Depends(get_db)
 ):
     """Get nearby users"""
-    try:
-        nearby = await LocationService.get_nearby_users(
-            session,
-            latitude,
-            longitude,
-            radius,
-            current_user["user_id"]
-        )
-        
-        return ApiResponse.success(
-            data=nearby,
-            message="Nearby users retrieved successfully"
-        )
-    except Exception as e:
-        logger.error(f"Get nearby users error: {e}")
-        return ApiResponse.error(
-            message="Failed to get nearby users",
-            status_code=500
-        )
+    nearby = await LocationService.get_nearby_users(
+        session,
+        latitude,
+        longitude,
+        radius,
+        current_user["user_id"]
+    )
+
+    return ApiResponse.success(
+        data=nearby,
+        message="Nearby users retrieved successfully"
+    )
 
 @router.get(
     "/drift-alerts/{ride_id}",
@@ -210,16 +175,9 @@ async def check_drift_alerts(
     session: AsyncSession = Depends(get_db)
 ):
     """Check drift alerts"""
-    try:
-        alerts = await LocationService.check_drift_alerts(session, ride_id)
-        
-        return ApiResponse.success(
-            data=alerts,
-            message="Drift alerts retrieved successfully"
-        )
-    except Exception as e:
-        logger.error(f"Check drift alerts error: {e}")
-        return ApiResponse.error(
-            message="Failed to check drift alerts",
-            status_code=500
-        )
+    alerts = await LocationService.check_drift_alerts(session, ride_id)
+
+    return ApiResponse.success(
+        data=alerts,
+        message="Drift alerts retrieved successfully"
+    )
@@ -205,6 +205,7 @@ async def get_user_rides(
     offset: int = Query(0, ge=0),
     sort_by: str = Query("scheduled_date_time"),
     sort_order: str = Query("asc", regex="^(asc|desc)$"),
+    cursor: str = Query(None, description="Keyset cursor from a previous page's next_cursor"),
     current_user: dict = Depends(get_current_user),
     session: AsyncSession = Depends(get_db)
 ):
@@ -213,8 +214,16 @@ async def get_user_rides(
         # Users can only see their own rides unless they're admin
         if user_id != current_user["user_id"] and current_user.get("role") != "admin":
             return ApiResponse.forbidden("Cannot access other user's rides")
-        
-        rides = await RideService.get_user_rides(
+
+        cursor_key = None
+        if cursor:
+            cursor_key = Helpers.decode_cursor(cursor)
+            if cursor_key is None:
+                return ApiResponse.validation_error(
+                    [{"field": "cursor", "message": "Invalid cursor"}]
+                )
+
+        rides, total = await RideService.get_user_rides(
             session,
             user_id,
             ride_type=ride_type,
@@ -222,19 +231,24 @@ async def get_user_rides(
             limit=limit,
             offset=offset,
             sort_by=sort_by,
-            sort_order=sort_order
+            sort_order=sort_order,
+            cursor=cursor_key
         )
-        
+
         pagination = Helpers.get_pagination_meta(
             page=(offset // limit) + 1,
             limit=limit,
-            total=len(rides)
+            total=total
         )
-        
+
         return ApiResponse.success(
             data={
                 "rides": rides,
-                "pagination": pagination
+                "pagination": pagination,
+                # Pass this back as `cursor` to fetch the next page
+                "next_cursor": Helpers.encode_cursor(
+                    rides[-1]["scheduled_date_time"], rides[-1]["id"]
+                ) if len(rides) == limit else None
             },
             message="User rides retrieved successfully"
         )
@@ -261,17 +275,26 @@ async def search_rides(
     is_public: bool = Query(True),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: str = Query(None, description="Keyset cursor from a previous page's next_cursor"),
     current_user: dict = Depends(get_current_user),
     session: AsyncSession = Depends(get_db)
 ):
     """Search rides"""
     try:
         from datetime import datetime
-        
+
         start_date_obj = datetime.fromisoformat(start_date) if start_date else None
         end_date_obj = datetime.fromisoformat(end_date) if end_date else None
-        
-        rides = await RideService.search_rides(
+
+        cursor_key = None
+        if cursor:
+            cursor_key = Helpers.decode_cursor(cursor)
+            if cursor_key is None:
+                return ApiResponse.validation_error(
+                    [{"field": "cursor", "message": "Invalid cursor"}]
+                )
+
+        rides, total = await RideService.search_rides(
             session,
             latitude=latitude,
             longitude=longitude,
@@ -282,19 +305,24 @@ async def search_rides(
             is_public=is_public,
             user_id=current_user["user_id"],
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor_key
         )
-        
+
         pagination = Helpers.get_pagination_meta(
             page=(offset // limit) + 1,
             limit=limit,
-            total=len(rides)
+            total=total
         )
-        
+
         return ApiResponse.success(
             data={
                 "rides": rides,
-                "pagination": pagination
+                "pagination": pagination,
+                # Pass this back as `cursor` to fetch the next page
+                "next_cursor": Helpers.encode_cursor(
+                    rides[-1]["scheduled_date_time"], rides[-1]["id"]
+                ) if len(rides) == limit else None
             },
             message="Rides retrieved successfully"
         )
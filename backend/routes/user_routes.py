@@ -54,7 +54,9 @@ async def update_profile(
 ):
     """Update user profile"""
     try:
-        update_data = request.dict(exclude_unset=True)
+        # model_dump is pydantic v2's native dumper; .dict() is a
+        # deprecation shim that forwards to it with extra overhead
+        update_data = request.model_dump(exclude_unset=True, exclude_none=True)
         user = await UserService.update_user_profile(
             session,
             user_id=current_user["user_id"],
@@ -89,14 +91,13 @@ async def search_users(
 ):
     """Search users"""
     try:
-        users = await UserService.search_users(
+        users, total_count = await UserService.search_users(
             session,
             query=q,
             limit=limit,
             offset=offset
         )
-        
-        total_count = len(users)
+
         pagination = Helpers.get_pagination_meta(
             page=(offset // limit) + 1,
             limit=limit,
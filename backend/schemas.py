@@ -1,9 +1,31 @@
-from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, EmailStr, Field, StringConstraints, field_validator, model_validator
+from typing import Annotated, Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
 import re
 
+# Validator patterns, compiled once at import. These run on every request
+# payload; re.search with a string literal re-pays the pattern-cache lookup
+# on each call, and the cache itself is capped at 512 entries.
+_LOWER = re.compile(r"[a-z]")
+_UPPER = re.compile(r"[A-Z]")
+_DIGIT = re.compile(r"\d")
+
+# E.164-shaped phone constraint checked inside pydantic-core (Rust), so no
+# Python validator frame runs per field. The password checks below stay as
+# field_validators because their per-rule messages are user-facing.
+Phone = Annotated[str, StringConstraints(pattern=r"^\+?[1-9]\d{1,14}$")]
+
+def _password_strength(v: str) -> str:
+    """Shared password-strength check for registration and password change"""
+    if not _LOWER.search(v):
+        raise ValueError("Password must contain lowercase letter")
+    if not _UPPER.search(v):
+        raise ValueError("Password must contain uppercase letter")
+    if not _DIGIT.search(v):
+        raise ValueError("Password must contain digit")
+    return v
+
 # ============================================================================
 # ENUMS
 # ============================================================================
@@ -101,27 +123,13 @@ class UserRegistrationRequest(BaseModel):
     password: str = Field(..., min_length=8)
     first_name: str = Field(..., min_length=2, max_length=50)
     last_name: str = Field(..., min_length=2, max_length=50)
-    phone: str
+    phone: Phone
 
     @field_validator("password")
     @classmethod
     def password_strength(cls, v: str) -> str:
         """Validate password strength"""
-        if not re.search(r"[a-z]", v):
-            raise ValueError("Password must contain lowercase letter")
-        if not re.search(r"[A-Z]", v):
-            raise ValueError("Password must contain uppercase letter")
-        if not re.search(r"\d", v):
-            raise ValueError("Password must contain digit")
-        return v
-
-    @field_validator("phone")
-    @classmethod
-    def validate_phone(cls, v: str) -> str:
-        """Validate phone number"""
-        if not re.match(r"^\+?[1-9]\d{1,14}$", v):
-            raise ValueError("Invalid phone number format")
-        return v
+        return _password_strength(v)
 
 class UserLoginRequest(BaseModel):
     """User login request"""
@@ -132,20 +140,12 @@ class UserProfileUpdate(BaseModel):
     """User profile update request"""
     first_name: Optional[str] = Field(None, min_length=2, max_length=50)
     last_name: Optional[str] = Field(None, min_length=2, max_length=50)
-    phone: Optional[str] = None
+    phone: Optional[Phone] = None
     bio: Optional[str] = Field(None, max_length=500)
     profile_picture_url: Optional[str] = None
     social_links: Optional[Dict[str, str]] = None
     is_profile_visible: Optional[bool] = None
 
-    @field_validator("phone")
-    @classmethod
-    def validate_phone(cls, v: Optional[str]) -> Optional[str]:
-        """Validate phone number"""
-        if v and not re.match(r"^\+?[1-9]\d{1,14}$", v):
-            raise ValueError("Invalid phone number format")
-        return v
-
 class ChangePasswordRequest(BaseModel):
     """Change password request"""
     current_password: str
@@ -155,13 +155,7 @@ class ChangePasswordRequest(BaseModel):
     @classmethod
     def password_strength(cls, v: str) -> str:
         """Validate password strength"""
-        if not re.search(r"[a-z]", v):
-            raise ValueError("Password must contain lowercase letter")
-        if not re.search(r"[A-Z]", v):
-            raise ValueError("Password must contain uppercase letter")
-        if not re.search(r"\d", v):
-            raise ValueError("Password must contain digit")
-        return v
+        return _password_strength(v)
 
 class UserStats(BaseModel):
     """User statistics"""
@@ -1,6 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from repositories.location_repository import LocationRepository
 from redis_client import redis_client
+from helpers import Helpers
 from exceptions import NotFoundError, BadRequestError
 import logging
 from datetime import datetime
@@ -96,20 +97,22 @@ class LocationService:
         end_date = None,
         ride_id: str = None,
         limit: int = 100,
-        offset: int = 0
-    ) -> list[dict]:
-        """Get user location history"""
+        offset: int = 0,
+        before: datetime = None
+    ) -> tuple[list[dict], int]:
+        """Get user location history as (entries, total_count)"""
         try:
             # Try cache first
-            cache_key = f"location_history:{user_id}:{start_date}:{end_date}:{ride_id}:{limit}:{offset}"
+            cache_key = f"location_history:{user_id}:{start_date}:{end_date}:{ride_id}:{limit}:{offset}:{before}"
             cached = await redis_client.get(cache_key)
             if cached:
-                return cached
-            
-            locations = await LocationRepository.get_user_location_history(
-                session, user_id, start_date, end_date, ride_id, limit, offset
+                return cached[0], cached[1]
+
+            locations, total = await LocationRepository.get_user_location_history(
+                session, user_id, start_date, end_date, ride_id, limit, offset,
+                before=before
             )
-            
+
             result = [
                 {
                     "id": loc.id,
@@ -121,12 +124,12 @@ class LocationService:
                 }
                 for loc in locations
             ]
-            
+
             # Cache for 10 minutes
-            await redis_client.set(cache_key, result, 600)
-            
+            await redis_client.set(cache_key, [result, total], 600)
+
             logger.info(f"Retrieved location history for user {user_id}")
-            return result
+            return result, total
         except Exception as e:
             logger.error(f"Get location history error: {e}")
             raise
@@ -185,33 +188,36 @@ class LocationService:
         session: AsyncSession,
         user_id: str,
         locations: list[dict]
-    ) -> list[dict]:
+    ) -> dict:
         """Batch update locations"""
         try:
-            results = []
-            
-            for location_data in locations:
-                try:
-                    location = await LocationService.update_user_location(
-                        session,
-                        user_id,
-                        location_data["latitude"],
-                        location_data["longitude"],
-                        location_data.get("accuracy"),
-                        location_data.get("timestamp")
-                    )
-                    results.append({
-                        "success": True,
-                        "location": location
-                    })
-                except Exception as e:
-                    results.append({
-                        "success": False,
-                        "error": str(e)
-                    })
-            
-            logger.info(f"Batch location update completed: {len(results)} updates processed")
-            return results
+            count = await LocationRepository.create_location_updates_batch(
+                session, user_id, locations
+            )
+            await session.commit()
+
+            # Refresh the cached current position from the newest sample;
+            # timestamps are normalized to naive UTC so a batch mixing
+            # tz-aware samples and missing ones compares cleanly
+            latest = max(
+                locations,
+                key=lambda loc: Helpers.to_naive_utc(loc.get("timestamp")) or datetime.min
+            )
+            await redis_client.set(
+                f"user_location:{user_id}",
+                {
+                    "latitude": latest["latitude"],
+                    "longitude": latest["longitude"],
+                    "accuracy": latest.get("accuracy"),
+                    "timestamp": (
+                        Helpers.to_naive_utc(latest.get("timestamp")) or datetime.utcnow()
+                    ).isoformat()
+                },
+                300  # 5 minutes
+            )
+
+            logger.info(f"Batch location update completed: {count} updates processed")
+            return {"processed": count}
         except Exception as e:
             logger.error(f"Batch update locations error: {e}")
             raise
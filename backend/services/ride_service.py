@@ -196,12 +196,14 @@ class RideService:
         limit: int = 20,
         offset: int = 0,
         sort_by: str = "scheduled_date_time",
-        sort_order: str = "asc"
-    ) -> list[dict]:
-        """Get user's rides"""
+        sort_order: str = "asc",
+        cursor: tuple = None
+    ) -> tuple[list[dict], int]:
+        """Get user's rides, returning (rides, total_count)"""
         try:
-            rides = await RideRepository.get_user_rides(
-                session, user_id, ride_type, status, limit, offset, sort_by, sort_order
+            rides, total = await RideRepository.get_user_rides(
+                session, user_id, ride_type, status, limit, offset, sort_by,
+                sort_order, cursor
             )
             
             result = []
@@ -230,8 +232,8 @@ class RideService:
                     "participant_count": len([p for p in ride.participants if p.status == "accepted"])
                 }
                 result.append(ride_dict)
-            
-            return result
+
+            return result, total
         except Exception as e:
             logger.error(f"Get user rides error: {e}")
             raise
@@ -248,13 +250,14 @@ class RideService:
         is_public: bool = True,
         user_id: str = None,
         limit: int = 20,
-        offset: int = 0
-    ) -> list[dict]:
-        """Search rides"""
+        offset: int = 0,
+        cursor: tuple = None
+    ) -> tuple[list[dict], int]:
+        """Search rides, returning (rides, total_count)"""
         try:
-            rides = await RideRepository.search_rides(
+            rides, total = await RideRepository.search_rides(
                 session, latitude, longitude, radius_km, start_date, end_date,
-                difficulty, is_public, user_id, limit, offset
+                difficulty, is_public, user_id, limit, offset, cursor
             )
             
             result = []
@@ -284,8 +287,8 @@ class RideService:
                     "distance_km": getattr(ride, 'distance_km', None)
                 }
                 result.append(ride_dict)
-            
-            return result
+
+            return result, total
         except Exception as e:
             logger.error(f"Search rides error: {e}")
             raise
@@ -1,6 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from repositories.user_repository import UserRepository
 from redis_client import redis_client
+from auth import invalidate_user_tokens
 from helpers import Helpers
 from exceptions import (
     ConflictError, NotFoundError, UnauthorizedError,
@@ -231,7 +232,8 @@ class UserService:
             
             # Remove from cache
             await redis_client.delete(f"user:{user_id}")
-            
+            await invalidate_user_tokens(user_id)
+
             logger.info(f"User logged out: {user_id}")
             return True
         except Exception as e:
@@ -249,11 +251,16 @@ class UserService:
             cached_user = await redis_client.get(f"user:{user_id}")
             if cached_user:
                 user_dict = cached_user
+                # Stats are never cached (they move with every ride action)
+                stats = await UserRepository.get_user_stats(session, user_id)
             else:
-                user = await UserRepository.find_by_id(session, user_id)
+                # Cache miss: user row and stats fused into one round-trip
+                user, stats = await UserRepository.get_user_with_stats(
+                    session, user_id
+                )
                 if not user:
                     raise NotFoundError("User not found")
-                
+
                 user_dict = {
                     "id": user.id,
                     "email": user.email,
@@ -270,10 +277,7 @@ class UserService:
                 }
                 
                 await redis_client.set(f"user:{user_id}", user_dict, 3600)
-            
-            # Get stats
-            stats = await UserRepository.get_user_stats(session, user_id)
-            
+
             return {
                 **user_dict,
                 "stats": stats
@@ -353,7 +357,8 @@ class UserService:
             # Clear refresh token (force re-login on all devices)
             await UserRepository.clear_refresh_token(session, user_id)
             await session.commit()
-            
+            await invalidate_user_tokens(user_id)
+
             logger.info(f"Password changed for user: {user_id}")
             return True
         except (NotFoundError, BadRequestError):
@@ -368,11 +373,11 @@ class UserService:
         query: str,
         limit: int = 20,
         offset: int = 0
-    ) -> list[dict]:
-        """Search users"""
+    ) -> tuple[list[dict], int]:
+        """Search users, returning (results, total_count)"""
         try:
-            users = await UserRepository.search(session, query, limit, offset)
-            
+            users, total = await UserRepository.search(session, query, limit, offset)
+
             return [
                 {
                     "id": user.id,
@@ -383,7 +388,7 @@ class UserService:
                     "is_profile_visible": user.is_profile_visible
                 }
                 for user in users
-            ]
+            ], total
         except Exception as e:
             logger.error(f"Search users error: {e}")
             raise
@@ -395,7 +400,9 @@ class UserService:
     ) -> bool:
         """Deactivate user account"""
         try:
-            success = await UserRepository.deactivate(session, user_id)
+            # Revoke the refresh token in the same statement so a
+            # deactivated account can't mint new access tokens
+            success = await UserRepository.deactivate_and_revoke(session, user_id)
             if not success:
                 raise NotFoundError("User not found")
             
@@ -403,7 +410,8 @@ class UserService:
             
             # Remove from cache
             await redis_client.delete(f"user:{user_id}")
-            
+            await invalidate_user_tokens(user_id)
+
             logger.info(f"User deactivated: {user_id}")
             return True
         except NotFoundError:
@@ -1,7 +1,7 @@
 from fastapi import WebSocket, WebSocketDisconnect, Depends, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Set, List
-import json
+import orjson
 import logging
 from datetime import datetime
 from database import get_db
@@ -14,7 +14,10 @@ logger = logging.getLogger(__name__)
 
 class ConnectionManager:
     """WebSocket connection manager for real-time updates"""
-    
+
+    # No per-instance dict; connection bookkeeping lives in these two maps
+    __slots__ = ("active_connections", "ride_monitors")
+
     def __init__(self):
         # Store active connections: {user_id: {ride_id: websocket}}
         self.active_connections: Dict[str, Dict[str, Set[WebSocket]]] = {}
@@ -97,17 +100,19 @@ class ConnectionManager:
         """Broadcast message to all users in a ride"""
         if ride_id not in self.ride_monitors:
             return
-        
+
+        # Serialize once; send_json would re-encode the same payload per socket
+        payload = orjson.dumps(message).decode()
         disconnected = []
-        
+
         for user_id in self.ride_monitors[ride_id]:
             if exclude_user and user_id == exclude_user:
                 continue
-            
+
             if user_id in self.active_connections:
                 for websocket in self.active_connections[user_id].get(ride_id, set()):
                     try:
-                        await websocket.send_json(message)
+                        await websocket.send_text(payload)
                     except Exception as e:
                         logger.error(f"Broadcast error: {e}")
                         disconnected.append((user_id, ride_id, websocket))
@@ -128,12 +133,13 @@ class ConnectionManager:
         
         if ride_id not in self.active_connections[user_id]:
             return
-        
+
+        payload = orjson.dumps(message).decode()
         disconnected = []
-        
+
         for websocket in self.active_connections[user_id][ride_id]:
             try:
-                await websocket.send_json(message)
+                await websocket.send_text(payload)
             except Exception as e:
                 logger.error(f"Send error: {e}")
                 disconnected.append((user_id, ride_id, websocket))